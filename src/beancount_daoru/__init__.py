@@ -3,21 +3,54 @@
 This package provides importers for various Chinese financial institutions and
 payment platforms, allowing users to easily convert their financial records
 into Beancount format for accounting purposes.
+
+Components are imported on first access, so a configuration using a few
+importers does not load the dependencies of the others (e.g. the PDF stack of
+the bank importers, or the LLM stack of the prediction hook).
 """
 
-from beancount_daoru.hooks.path_to_name import Hook as PathToName
-from beancount_daoru.hooks.reorder_by_importer_name import Hook as ReorderByImporterName
-from beancount_daoru.importers.alipay import Importer as AlipayImporter
-from beancount_daoru.importers.boc import Importer as BOCImporter
-from beancount_daoru.importers.bocom import Importer as BOCOMImporter
-from beancount_daoru.importers.jd import Importer as JDImporter
-from beancount_daoru.importers.meituan import Importer as MeituanImporter
-from beancount_daoru.importers.wechat import Importer as WechatImporter
+from importlib import import_module
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from beancount_daoru.dispatch import Dispatcher
+    from beancount_daoru.hooks.path_to_name import Hook as PathToName
+    from beancount_daoru.hooks.predict_missing_posting import (
+        Hook as PredictMissingPosting,
+    )
+    from beancount_daoru.hooks.reorder_by_importer_name import (
+        Hook as ReorderByImporterName,
+    )
+    from beancount_daoru.importers.alipay import Importer as AlipayImporter
+    from beancount_daoru.importers.boc import Importer as BOCImporter
+    from beancount_daoru.importers.bocom import Importer as BOCOMImporter
+    from beancount_daoru.importers.jd import Importer as JDImporter
+    from beancount_daoru.importers.meituan import Importer as MeituanImporter
+    from beancount_daoru.importers.wechat import Importer as WechatImporter
+    from beancount_daoru.ingest import Ingest
+
+# public name -> (module, attribute)
+_LAZY_ATTRIBUTES = {
+    "AlipayImporter": ("beancount_daoru.importers.alipay", "Importer"),
+    "BOCImporter": ("beancount_daoru.importers.boc", "Importer"),
+    "BOCOMImporter": ("beancount_daoru.importers.bocom", "Importer"),
+    "Dispatcher": ("beancount_daoru.dispatch", "Dispatcher"),
+    "Ingest": ("beancount_daoru.ingest", "Ingest"),
+    "JDImporter": ("beancount_daoru.importers.jd", "Importer"),
+    "MeituanImporter": ("beancount_daoru.importers.meituan", "Importer"),
+    "PathToName": ("beancount_daoru.hooks.path_to_name", "Hook"),
+    "PredictMissingPosting": ("beancount_daoru.hooks.predict_missing_posting", "Hook"),
+    "ReorderByImporterName": ("beancount_daoru.hooks.reorder_by_importer_name", "Hook"),
+    "WechatImporter": ("beancount_daoru.importers.wechat", "Importer"),
+}
 
 __all__ = [
     "AlipayImporter",
     "BOCImporter",
     "BOCOMImporter",
+    "Dispatcher",
+    "Ingest",
     "JDImporter",
     "MeituanImporter",
     "PathToName",
@@ -26,11 +59,19 @@ __all__ = [
 ]
 
 # Optional components - will only be available if dependencies are installed
-try:
-    from beancount_daoru.hooks.predict_missing_posting import (
-        Hook as PredictMissingPosting,
-    )
-
+if all(find_spec(name) is not None for name in ("diskcache", "openai", "usearch")):
     __all__ += ["PredictMissingPosting"]
-except ImportError:
-    pass
+
+
+def __getattr__(name: str) -> object:
+    if name not in _LAZY_ATTRIBUTES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    module, attribute = _LAZY_ATTRIBUTES[name]
+    value: object = getattr(import_module(module), attribute)  # pyright: ignore[reportAny]
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,117 @@
+"""Identification dispatcher for multiple importers.
+
+This module provides a dispatcher that identifies files for a set of importers
+at once, instead of letting each importer match every file on its own.
+"""
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+from beancount_daoru.importer import Importer
+
+# number of file paths whose candidate importers are remembered
+_CACHE_SIZE = 1 << 16
+
+
+class Dispatcher:
+    """Dispatcher routing files to the importers whose filename pattern matches.
+
+    Importers sharing the same pattern (e.g. importers of several accounts of
+    the same source) are grouped, and the distinct patterns are compiled into a
+    single alternation. Files matching no pattern, usually the majority of a
+    downloads folder, are rejected with one regex match; otherwise only the
+    patterns after the first matching alternative are checked again. Verdicts
+    are cached by file path.
+
+    Once created, the importers identify files through the dispatcher, so it
+    takes effect when the importers are handed to beangulp as usual.
+    """
+
+    def __init__(self, importers: Iterable[Importer]) -> None:
+        """Initialize the dispatcher and attach it to the importers.
+
+        Args:
+            importers: Importers to identify files for.
+        """
+        groups: dict[tuple[str, int], list[Importer]] = {}
+        for importer in importers:
+            pattern = importer.filename_pattern
+            groups.setdefault((pattern.pattern, pattern.flags), []).append(importer)
+        patterns = [
+            (re.compile(pattern, flags), tuple(group))
+            for (pattern, flags), group in groups.items()
+        ]
+        combinable = [entry for entry in patterns if _is_combinable(entry[0])]
+        self.__patterns = combinable + [
+            entry for entry in patterns if not _is_combinable(entry[0])
+        ]
+        self.__combinable = len(combinable)
+        self.__combined = _combine(pattern for pattern, _ in combinable)
+        self.__cached_candidates = lru_cache(maxsize=_CACHE_SIZE)(self.__candidates)
+        for _, group in self.__patterns:
+            for importer in group:
+                importer.use_dispatcher(self.candidates)
+
+    def __getstate__(self) -> dict[str, object]:
+        """Get the state for pickling, without the cached verdicts.
+
+        Returns:
+            The attributes of the dispatcher except the cache.
+        """
+        state: dict[str, object] = vars(self).copy()
+        del state["_Dispatcher__cached_candidates"]
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        """Restore the state after unpickling with an empty cache.
+
+        Args:
+            state: The attributes of the dispatcher except the cache.
+        """
+        vars(self).update(state)
+        self.__cached_candidates = lru_cache(maxsize=_CACHE_SIZE)(self.__candidates)
+
+    def candidates(self, filepath: str) -> tuple[Importer, ...]:
+        """Find the importers whose filename pattern matches a file.
+
+        Args:
+            filepath: Path of the file.
+
+        Returns:
+            The matching importers, in order of their patterns.
+        """
+        return self.__cached_candidates(filepath)
+
+    def __candidates(self, filepath: str) -> tuple[Importer, ...]:
+        name = Path(filepath).name
+        start = 0
+        if self.__combined is not None:
+            match = self.__combined.fullmatch(name)
+            if match is None or match.lastgroup is None:
+                start = self.__combinable
+            else:
+                start = int(match.lastgroup[1:])
+        # patterns after the first match may overlap with it
+        return tuple(
+            importer
+            for pattern, group in self.__patterns[start:]
+            if pattern.fullmatch(name) is not None
+            for importer in group
+        )
+
+
+def _is_combinable(pattern: re.Pattern[str]) -> bool:
+    # wrapping would renumber groups referenced by the pattern, and flags would
+    # apply to all alternatives
+    return pattern.groups == 0 and pattern.flags == re.UNICODE
+
+
+def _combine(patterns: Iterable[re.Pattern[str]]) -> re.Pattern[str] | None:
+    alternatives = [
+        f"(?P<_{index}>{pattern.pattern})" for index, pattern in enumerate(patterns)
+    ]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives))
@@ -6,11 +6,14 @@ and natural language processing of transaction descriptions.
 """
 
 import asyncio
+import json
 import re
-from collections.abc import Mapping
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping
+from contextlib import asynccontextmanager
 from hashlib import blake2b
 from pathlib import Path
-from typing import TypedDict
+from typing import TypedDict, TypeVar
 
 import numpy as np
 from beancount import (
@@ -37,6 +40,144 @@ from usearch.index import Index, Matches
 from beancount_daoru.hook import Hook as BaseHook
 from beancount_daoru.hook import Imported
 
+# default number of texts embedded in one request
+_BATCH_SIZE = 64
+
+# default seconds to wait for more texts before sending a partial batch
+_FLUSH_INTERVAL = 0.05
+
+# matches searched per requested example, as nearest matches often share
+# their account
+_SEARCH_OVERSAMPLING = 8
+
+# file of the history index in the index directory
+_INDEX_FILENAME = "history.usearch"
+
+# default number of requests in flight per model
+_MAX_CONCURRENCY = 8
+
+# default number of retries of requests failing with 429, 5xx or network errors
+_MAX_RETRIES = 5
+
+# default maximum size in bytes of the cache of chat completions
+_COMPLETION_CACHE_SIZE = 1 << 28
+
+_T = TypeVar("_T")
+
+
+class _Bucket:
+    """Token bucket refilled at a rate per minute, up to a minute of capacity."""
+
+    def __init__(
+        self,
+        rate_per_minute: float | None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """Initialize the bucket, full.
+
+        Args:
+            rate_per_minute: Refill rate per minute, unlimited if None.
+            clock: Monotonic clock in seconds.
+            sleep: Coroutine function waiting for a number of seconds.
+        """
+        self.__rate = None if rate_per_minute is None else rate_per_minute / 60
+        self.__capacity = rate_per_minute or 0.0
+        self.__level = self.__capacity
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__updated = clock()
+
+    async def take(self, amount: float) -> None:
+        """Wait until the amount is available and take it.
+
+        Args:
+            amount: Amount to take, capped at the capacity of the bucket.
+        """
+        if self.__rate is None:
+            return
+        amount = min(amount, self.__capacity)
+        while True:
+            self.__refill()
+            if self.__level >= amount:
+                self.__level -= amount
+                return
+            await self.__sleep((amount - self.__level) / self.__rate)
+
+    def adjust(self, amount: float) -> None:
+        """Take an amount without waiting, e.g. to correct an estimate.
+
+        Args:
+            amount: Amount to take, or to give back if negative.
+        """
+        if self.__rate is None:
+            return
+        self.__refill()
+        self.__level = min(self.__level - amount, self.__capacity)
+
+    def __refill(self) -> None:
+        now = self.__clock()
+        if self.__rate is not None:
+            elapsed = now - self.__updated
+            self.__level = min(self.__capacity, self.__level + elapsed * self.__rate)
+        self.__updated = now
+
+
+class _Limiter:
+    """Limiter of the requests in flight and the request and token rates."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        requests_per_minute: float | None,
+        tokens_per_minute: float | None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.__max_concurrency = max_concurrency
+        # semaphores are bound to the event loop of each run of the hook
+        self.__semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self.__requests = _Bucket(requests_per_minute, clock=clock, sleep=sleep)
+        self.__tokens = _Bucket(tokens_per_minute, clock=clock, sleep=sleep)
+
+    @asynccontextmanager
+    async def limit(self, tokens: int) -> AsyncGenerator[None]:
+        """Wait for a slot and the rate limits before a request.
+
+        Args:
+            tokens: Estimated number of tokens of the request.
+
+        Yields:
+            Nothing, the request is sent within the context.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self.__semaphores.get(loop)
+        if semaphore is None:
+            self.__semaphores.clear()
+            semaphore = self.__semaphores[loop] = asyncio.Semaphore(
+                self.__max_concurrency
+            )
+        async with semaphore:
+            await self.__requests.take(1)
+            await self.__tokens.take(tokens)
+            yield
+
+    def settle(self, estimated: int, used: int) -> None:
+        """Correct the token rate with the number of tokens actually used.
+
+        Args:
+            estimated: Number of tokens estimated before the request.
+            used: Number of tokens reported by the model.
+        """
+        self.__tokens.adjust(used - estimated)
+
+
+def _estimate_tokens(*texts: str) -> int:
+    # tokens are at most one per character for CJK texts, usually fewer
+    return sum(len(text) for text in texts)
+
 
 class EmbeddingModelSettings(TypedDict):
     """Settings for the embedding model.
@@ -45,14 +186,34 @@ class EmbeddingModelSettings(TypedDict):
         name: Model name identifier.
         base_url: Base URL for the model API.
         api_key: API key for authentication.
+        batch_size: Maximum number of texts embedded in one request.
+        flush_interval: Seconds to wait for more texts before sending a
+            request with fewer texts than the batch size.
+        max_concurrency: Maximum number of requests in flight, 8 by default.
+        requests_per_minute: Maximum rate of requests, unlimited by default.
+        tokens_per_minute: Maximum rate of tokens, unlimited by default.
+        max_retries: Retries of requests failing with a 429 or 5xx status or
+            a network error, with exponential backoff, 5 by default.
     """
 
     name: str
     base_url: str
     api_key: str
+    batch_size: NotRequired[int]
+    flush_interval: NotRequired[float]
+    max_concurrency: NotRequired[int]
+    requests_per_minute: NotRequired[float]
+    tokens_per_minute: NotRequired[float]
+    max_retries: NotRequired[int]
 
 
 class _Encoder:
+    """Encoder coalescing the texts awaited concurrently into batched requests.
+
+    Embeddings are cached on disk by text, so only texts never seen before are
+    sent to the model.
+    """
+
     def __init__(
         self,
         /,
@@ -63,49 +224,160 @@ class _Encoder:
         self.__embeddings_client = AsyncOpenAI(
             base_url=model_settings.get("base_url"),
             api_key=model_settings.get("api_key"),
+            max_retries=model_settings.get("max_retries", _MAX_RETRIES),
         ).embeddings
+        self.__limiter = _Limiter(
+            max_concurrency=model_settings.get("max_concurrency", _MAX_CONCURRENCY),
+            requests_per_minute=model_settings.get("requests_per_minute"),
+            tokens_per_minute=model_settings.get("tokens_per_minute"),
+        )
 
         cache_dir.mkdir(parents=True, exist_ok=True)
-        _cache_prefix = re.sub(r"[^a-zA-Z0-9]", "_", self.__model_name)
-        cache_path = cache_dir / f"{_cache_prefix}.embeddings.diskcache"
+        cache_path = (
+            cache_dir / f"{_cache_prefix(self.__model_name)}.embeddings.diskcache"
+        )
         self.__cache = Cache(cache_path)
         self.__validator = TypeAdapter(list[float])
+        self.__batch_size = model_settings.get("batch_size", _BATCH_SIZE)
+        self.__flush_interval = model_settings.get("flush_interval", _FLUSH_INTERVAL)
+        self.__pending: dict[str, asyncio.Future[list[float]]] = {}
+        self.__timer: asyncio.TimerHandle | None = None
+        self.__requests: set[asyncio.Task[None]] = set()
 
     async def encode(self, text: str) -> list[float]:
         if text in self.__cache:
             cached = self.__cache[text]  # pyright: ignore[reportUnknownVariableType]
             return self.__validator.validate_python(cached)
 
-        response = await self.__embeddings_client.create(
-            input=text,
-            model=self.__model_name,
-        )
-        embedding = response.data[0].embedding
-
-        self.__cache[text] = embedding
-        return embedding
+        future = self.__pending.get(text)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.__pending[text] = loop.create_future()
+            if len(self.__pending) >= self.__batch_size:
+                self.__flush()
+            elif self.__timer is None:
+                self.__timer = loop.call_later(self.__flush_interval, self.__flush)
+        return await future
+
+    def __flush(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        batch, self.__pending = self.__pending, {}
+        task = asyncio.ensure_future(self.__request(batch))
+        # keep a reference until the request completes
+        self.__requests.add(task)
+        task.add_done_callback(self.__requests.discard)
+
+    async def __request(self, batch: dict[str, asyncio.Future[list[float]]]) -> None:
+        texts = list(batch)
+        tokens = _estimate_tokens(*texts)
+        try:
+            async with self.__limiter.limit(tokens):
+                response = await self.__embeddings_client.create(
+                    input=texts,
+                    model=self.__model_name,
+                )
+            # servers compatible with the API may report no usage, despite the type
+            if response.usage is not None:  # pyright: ignore[reportUnnecessaryComparison]
+                self.__limiter.settle(tokens, response.usage.total_tokens)
+            embeddings = {texts[data.index]: data.embedding for data in response.data}
+        except Exception as error:  # noqa: BLE001
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for text, future in batch.items():
+            if future.done():
+                continue
+            if text not in embeddings:
+                future.set_exception(ValueError(f"no embedding of {text!r}"))
+                continue
+            self.__cache[text] = embeddings[text]
+            future.set_result(embeddings[text])
+
+
+def _cache_prefix(model_name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9]", "_", model_name)
 
 
 class _TransactionIndex:
+    """Vector index of the transactions of all accounts, persisted on disk.
+
+    Each vector is labeled with the account of the posting missing from its
+    transaction, so one search finds similar transactions of any account.
+
+    The index stored by a previous run is updated with the transactions added
+    since, and transactions no longer added (edited or deleted entries, or
+    entries of closed accounts) are removed from it. If nothing changed, the
+    stored index is memory-mapped instead of loaded.
+    """
+
     def __init__(
         self,
         encoder: _Encoder,
         ndim: int,
+        path: Path,
     ) -> None:
         self.__encoder = encoder
-        self.__transaction_mapping: dict[int, Transaction] = {}
+        self.__ndim = ndim
+        self.__path = path
+        self.__entries: dict[int, tuple[str, Transaction, Account]] = {}
+        self.__keys_per_account: dict[Account, set[int]] = {}
         self.__embedding_index = Index(ndim=ndim)
 
-    async def add(self, transaction: Transaction) -> None:
+    def add(self, transaction: Transaction, account: Account) -> None:
         description = self._create_description(transaction)
-        transaction_id = self._hash(description)
-        if transaction_id not in self.__embedding_index:
-            embedding = await self.__encoder.encode(description)
-            _ = self.__embedding_index.add(  # pyright: ignore[reportUnknownVariableType]
-                keys=transaction_id,
-                vectors=np.array(embedding),
+        key = self._hash(f"{account}\n{description}")
+        self.__entries[key] = (description, transaction, account)
+        self.__keys_per_account.setdefault(account, set()).add(key)
+
+    def remove_account(self, account: Account) -> None:
+        for key in self.__keys_per_account.pop(account, set()):
+            del self.__entries[key]
+
+    async def build(self) -> None:
+        """Synchronize the stored index with the added transactions."""
+        stored = self._restore(view=True)
+        stored_keys: set[int] = set()
+        if stored is not None:
+            stored_keys = {int(key) for key in stored.keys}  # pyright: ignore[reportUnknownVariableType, reportUnknownArgumentType]
+        stale = stored_keys - self.__entries.keys()
+        missing = [key for key in self.__entries if key not in stored_keys]
+        if stored is not None and not stale and not missing:
+            self.__embedding_index = stored
+            return
+        del stored
+
+        index = self._restore(view=False) if stored_keys else None
+        if index is None:
+            index = Index(ndim=self.__ndim)
+            missing = list(self.__entries)
+        elif stale:
+            _ = index.remove(np.array(list(stale), dtype=np.uint64))  # pyright: ignore[reportUnknownVariableType]
+        if missing:
+            embeddings = await asyncio.gather(
+                *(self.__encoder.encode(self.__entries[key][0]) for key in missing)
+            )
+            _ = index.add(  # pyright: ignore[reportUnknownVariableType]
+                keys=np.array(missing, dtype=np.uint64),
+                vectors=np.array(embeddings),
             )
-            self.__transaction_mapping[transaction_id] = transaction
+        self.__embedding_index = index
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        # replace the file atomically, it may still be mapped by other runs
+        temporary = self.__path.with_suffix(".tmp")
+        _ = index.save(temporary)
+        _ = temporary.replace(self.__path)
+
+    def _restore(self, *, view: bool) -> Index | None:
+        try:
+            index = Index.restore(self.__path, view=view)
+        except (OSError, RuntimeError, ValueError):
+            return None
+        if index is None or index.ndim != self.__ndim:
+            return None
+        return index
 
     def _create_description(self, transaction: Transaction) -> str:
         return format_entry(transaction)
@@ -117,22 +389,33 @@ class _TransactionIndex:
 
     async def search(
         self, transaction: Transaction, topk: int
-    ) -> list[tuple[Transaction, float]]:
+    ) -> list[tuple[Transaction, Account, float]]:
+        """Search the most similar transaction of each account.
+
+        Args:
+            transaction: The transaction to find similar ones of.
+            topk: Maximum number of accounts.
+
+        Returns:
+            Similar transactions with their account and distance, nearest first.
+        """
         description = self._create_description(transaction)
         query_embedding = await self.__encoder.encode(description)
 
         matches = self.__embedding_index.search(
             vectors=np.array(query_embedding),
-            count=topk,
+            count=topk * _SEARCH_OVERSAMPLING,
         )
 
         if not isinstance(matches, Matches):
             raise TypeError(matches)
 
-        return [
-            (self.__transaction_mapping[match.key], float(match.distance))
-            for match in matches
-        ]
+        results: dict[Account, tuple[Transaction, Account, float]] = {}
+        for match in matches:
+            _, target_transaction, account = self.__entries[match.key]
+            if account not in results:
+                results[account] = (target_transaction, account, float(match.distance))
+        return list(results.values())[:topk]
 
 
 class _HistoryIndex:
@@ -140,40 +423,51 @@ class _HistoryIndex:
         self,
         encoder: _Encoder,
         ndim: int,
+        directory: Path,
     ) -> None:
-        self.__encoder = encoder
-        self.__ndim = ndim
-        self.__data_per_account: dict[Account, tuple[Meta, _TransactionIndex]] = {}
+        self.__directory = directory
+        self.__accounts: dict[Account, Meta] = {}
+        self.__transaction_index = _TransactionIndex(
+            encoder=encoder,
+            ndim=ndim,
+            path=directory / _INDEX_FILENAME,
+        )
 
-    async def add(self, directive: Directive) -> None:
+    def add(self, directive: Directive) -> None:
         match directive:
             case Open():
-                if directive.account in self.__data_per_account:
+                if directive.account in self.__accounts:
                     msg = f"open existing account: {directive}"
                     raise ValueError(msg)
-                txn_index = _TransactionIndex(
-                    encoder=self.__encoder,
-                    ndim=self.__ndim,
-                )
-                self.__data_per_account[directive.account] = (directive.meta, txn_index)
+                self.__accounts[directive.account] = directive.meta
             case Close():
-                if directive.account not in self.__data_per_account:
+                if directive.account not in self.__accounts:
                     msg = f"close non-existing account: {directive}"
                     raise ValueError(msg)
-                del self.__data_per_account[directive.account]
+                del self.__accounts[directive.account]
+                self.__transaction_index.remove_account(directive.account)
             case Transaction() as txn:
                 if self._check_transaction(txn):
                     for posting in txn.postings:
-                        if posting.account not in self.__data_per_account:
+                        if posting.account not in self.__accounts:
                             msg = f"transaction with non-existing account: {txn}"
                             raise ValueError(msg)
                         other_postings = [p for p in txn.postings if p is not posting]
                         missing_posting_txn = txn._replace(postings=other_postings)
-                        index = self.__data_per_account[posting.account][1]
-                        await index.add(missing_posting_txn)
+                        self.__transaction_index.add(
+                            missing_posting_txn, posting.account
+                        )
             case _:
                 pass
 
+    async def build(self) -> None:
+        """Synchronize the stored index with the added directives."""
+        await self.__transaction_index.build()
+        # indices stored per account by earlier versions
+        for path in self.__directory.glob("*.usearch"):
+            if path.name != _INDEX_FILENAME:
+                path.unlink()
+
     def _check_transaction(self, transaction: Transaction) -> bool:
         if transaction.flag is not None and transaction.flag != FLAG_OKAY:
             return False
@@ -191,20 +485,12 @@ class _HistoryIndex:
         Returns:
             Mapping of account names to metadata.
         """
-        return {account: meta for account, (meta, _) in self.__data_per_account.items()}
+        return dict(self.__accounts)
 
     async def search(
         self, transaction: Transaction, n_few_shots: int
     ) -> list[tuple[Transaction, Account, float]]:
-        candidates: list[tuple[Transaction, Account, float]] = []
-        for account, (_, transaction_index) in self.__data_per_account.items():
-            for target_transaction, distance in await transaction_index.search(
-                transaction, 1
-            ):
-                candidates.append((target_transaction, account, distance))
-
-        candidates.sort(key=lambda x: x[2])
-        return candidates[:n_few_shots]
+        return await self.__transaction_index.search(transaction, n_few_shots)
 
 
 class ChatModelSettings(TypedDict):
@@ -214,27 +500,72 @@ class ChatModelSettings(TypedDict):
         name: Model name identifier.
         base_url: Base URL for the model API.
         api_key: API key for authentication.
+        temperature: Sampling temperature.
+        max_concurrency: Maximum number of requests in flight, 8 by default.
+        requests_per_minute: Maximum rate of requests, unlimited by default.
+        tokens_per_minute: Maximum rate of tokens, unlimited by default.
+        max_retries: Retries of requests failing with a 429 or 5xx status or
+            a network error, with exponential backoff, 5 by default.
     """
 
     name: str
     base_url: str
     api_key: str
     temperature: NotRequired[float]
+    max_concurrency: NotRequired[int]
+    requests_per_minute: NotRequired[float]
+    tokens_per_minute: NotRequired[float]
+    max_retries: NotRequired[int]
 
 
 class _ChatBot:
-    def __init__(self, *, model_settings: ChatModelSettings) -> None:
+    """Chat bot whose completions are cached on disk.
+
+    Completions are keyed by a hash of the model, its temperature and the
+    whole prompt, including the response schema and thus the set of accounts,
+    so a cached completion is only reused for exactly the same request. Only
+    completions which pass validation are cached, so invalid ones are retried.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_settings: ChatModelSettings,
+        cache_dir: Path,
+        cache_ttl: float | None = None,
+        cache_size: int = _COMPLETION_CACHE_SIZE,
+    ) -> None:
         """Initialize the chat bot.
 
         Args:
             model_settings: Settings for the chat model.
+            cache_dir: Directory of the cache of completions.
+            cache_ttl: Seconds a completion is cached for, forever if None.
+            cache_size: Maximum size in bytes of the cache, beyond which the
+                least recently used completions are evicted.
         """
         self.__model_name = model_settings.get("name")
         self.__chat_client = AsyncOpenAI(
             base_url=model_settings.get("base_url"),
             api_key=model_settings.get("api_key"),
+            max_retries=model_settings.get("max_retries", _MAX_RETRIES),
         ).chat.completions
         self.__temperature = model_settings.get("temperature", None)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_path = (
+            cache_dir / f"{_cache_prefix(self.__model_name)}.completions.diskcache"
+        )
+        self.__cache = Cache(
+            cache_path,
+            size_limit=cache_size,
+            eviction_policy="least-recently-used",
+        )
+        self.__cache_ttl = cache_ttl
+        self.__limiter = _Limiter(
+            max_concurrency=model_settings.get("max_concurrency", _MAX_CONCURRENCY),
+            requests_per_minute=model_settings.get("requests_per_minute"),
+            tokens_per_minute=model_settings.get("tokens_per_minute"),
+        )
 
     async def complete(
         self,
@@ -242,24 +573,50 @@ class _ChatBot:
         /,
         system_prompt: str,
         response_format: JSONSchema,
-    ) -> str:
-        response = await self.__chat_client.create(
-            model=self.__model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": response_format,
-            },
-            temperature=self.__temperature,
-        )
+        validate: Callable[[str], _T],
+    ) -> _T:
+        key = self._cache_key(user_prompt, system_prompt, response_format)
+        cached = self.__cache.get(key)  # pyright: ignore[reportUnknownVariableType]
+        if isinstance(cached, str):
+            return validate(cached)
+
+        tokens = _estimate_tokens(system_prompt, user_prompt)
+        async with self.__limiter.limit(tokens):
+            response = await self.__chat_client.create(
+                model=self.__model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": response_format,
+                },
+                temperature=self.__temperature,
+            )
+        if response.usage is not None:
+            self.__limiter.settle(tokens, response.usage.total_tokens)
         content = response.choices[0].message.content
         if content is None:
             msg = "content is None"
             raise ValueError(msg)
-        return content
+        result = validate(content)
+        _ = self.__cache.set(key, content, expire=self.__cache_ttl)
+        return result
+
+    def _cache_key(
+        self, user_prompt: str, system_prompt: str, response_format: JSONSchema
+    ) -> str:
+        request = [
+            self.__model_name,
+            self.__temperature,
+            system_prompt,
+            response_format,
+            user_prompt,
+        ]
+        hasher = blake2b(digest_size=16)
+        hasher.update(json.dumps(request, sort_keys=True).encode("utf-8"))
+        return hasher.hexdigest()
 
 
 class _AccountPredictor:
@@ -380,13 +737,19 @@ class _AccountPredictor:
         if not self._check_transaction(transaction):
             return None
         user_prompt = await self.user_prompt(transaction)
-        response = await self.__chat_bot.complete(
+        return await self.__chat_bot.complete(
             user_prompt,
             system_prompt=self.system_prompt,
             response_format=self.response_format,
+            validate=self._validate,
         )
 
-        return self.__validator.validate_json(response)
+    def _validate(self, response: str) -> Account | None:
+        account = self.__validator.validate_json(response)
+        if account is not None and account not in self.__index.accounts:
+            msg = f"unknown account {account!r}"
+            raise ValueError(msg)
+        return account
 
 
 class Hook(BaseHook):
@@ -409,33 +772,49 @@ class Hook(BaseHook):
        classification decisions by combining historical transaction patterns with
        contextual information from the current transaction.
 
-    4. **Caching Mechanism**: Caching vectors on disk to save computational overhead
-       from repeated calculations, improving performance for subsequent runs.
+    4. **Caching Mechanism**: Caching vectors and the vector indices of the
+       ledger on disk to save computational overhead from repeated calculations.
+       Subsequent runs only update the indices with the changes of the ledger,
+       and reuse the predictions of transactions predicted before.
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         *,
         chat_model_settings: ChatModelSettings,
         embed_model_settings: EmbeddingModelSettings,
         cache_dir: Path | None = None,
         extra_system_prompt: str = "",
+        prediction_cache_ttl: float | None = None,
+        prediction_cache_size: int = _COMPLETION_CACHE_SIZE,
     ) -> None:
         """Initialize the account prediction hook.
 
         Args:
             chat_model_settings: Settings for the chat model.
             embed_model_settings: Settings for the embedding model.
-            cache_dir: Path to cache indices and embeddings.
+            cache_dir: Path to cache indices, embeddings and predictions.
             extra_system_prompt: Additional instructions for the LLM.
+            prediction_cache_ttl: Seconds a prediction is cached for, forever
+                if None. Predictions are reused for identical prompts only.
+            prediction_cache_size: Maximum size in bytes of the cache of
+                predictions, beyond which the least recently used ones are
+                evicted.
         """
         if cache_dir is None:
             cache_dir = Path(Path.cwd(), ".cache", *__name__.split("."))
-        self.__chat_bot = _ChatBot(model_settings=chat_model_settings)
+        self.__chat_bot = _ChatBot(
+            model_settings=chat_model_settings,
+            cache_dir=cache_dir,
+            cache_ttl=prediction_cache_ttl,
+            cache_size=prediction_cache_size,
+        )
         self.__encoder = _Encoder(
             model_settings=embed_model_settings,
             cache_dir=cache_dir,
         )
+        model_name = embed_model_settings["name"]
+        self.__index_dir = cache_dir / f"{_cache_prefix(model_name)}.index"
         self.__extra_system_prompt = extra_system_prompt
 
     @override
@@ -452,6 +831,7 @@ class Hook(BaseHook):
         index = _HistoryIndex(
             encoder=self.__encoder,
             ndim=len(measurement_embedding),
+            directory=self.__index_dir,
         )
 
         for directive in tqdm(
@@ -459,7 +839,8 @@ class Hook(BaseHook):
             desc="indexing existing directives",
             leave=False,
         ):
-            await index.add(directive)
+            index.add(directive)
+        await index.build()
 
         predictor = _AccountPredictor(
             chat_bot=self.__chat_bot,
@@ -7,21 +7,64 @@ and integration with the Beangulp framework.
 """
 
 import datetime
-from collections.abc import Iterable, Iterator, Mapping
+import re
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
+from contextlib import nullcontext
 from decimal import Decimal
-from functools import lru_cache
-from itertools import groupby
+from functools import lru_cache, partial
+from itertools import groupby, islice
 from operator import attrgetter
 from pathlib import Path
-from re import Pattern
-from typing import NamedTuple, Protocol
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Generic,
+    Literal,
+    NamedTuple,
+    Protocol,
+    TypeVar,
+    cast,
+)
 
 import beancount
 import beangulp
 from beangulp.extract import DUPLICATE
-from typing_extensions import TypedDict, Unpack, override
+from pydantic import PlainValidator, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict, Unpack, override
 
+from beancount_daoru.journal import Journal, JournalEntry
 from beancount_daoru.reader import Reader
+from beancount_daoru.utils import file_digest
+
+if TYPE_CHECKING:
+    from diskcache import Cache
+
+# number of records handed to a parser at once
+_BATCH_SIZE = 1024
+
+# number of files whose metadata is kept in memory per importer
+_METADATA_CACHE_SIZE = 256
+
+# date window of similar transactions deemed duplicates, as in beangulp
+_DUPLICATE_WINDOW = datetime.timedelta(days=2)
+
+# number of distinct values kept per memoized field decoder
+_DECODER_CACHE_SIZE = 1 << 12
+
+# error of transactions imported before whose status or postings changed since
+_REVISED_MESSAGE = "transaction changed since it was imported"
+
+# characters not allowed in beancount links
+_LINK_INVALID_CHARS = re.compile(r"[^A-Za-z0-9\-_/.]")
+
+_T = TypeVar("_T")
+_RecordT = TypeVar("_RecordT", bound=Mapping[str, object])
+
+_decoders: dict[str, Callable[[], "DecoderCacheInfo"]] = {}
+_type_adapters: dict[type, object] = {}
 
 
 class Extra(NamedTuple):
@@ -39,6 +82,10 @@ class Extra(NamedTuple):
         status: Status of the transaction (e.g., successful, pending, failed).
         place: Location or place of the transaction.
         remarks: Additional remarks or notes about the transaction.
+        transaction_id: Stable identifier of the transaction at its source
+            (e.g. the order number of a payment platform).
+        merchant_order_id: Order number of the transaction at the merchant,
+            shared by payments and their refunds.
     """
 
     time: datetime.time | None = None
@@ -48,6 +95,8 @@ class Extra(NamedTuple):
     status: str | None = None
     place: str | None = None
     remarks: str | None = None
+    transaction_id: str | None = None
+    merchant_order_id: str | None = None
 
 
 class Posting(NamedTuple):
@@ -174,6 +223,555 @@ class Parser(Protocol):
         """
         ...
 
+    def parse_many(
+        self, records: Sequence[dict[str, str]]
+    ) -> list[Transaction | ParserError]:
+        """Parse a batch of transaction records.
+
+        Parsers may override this to process records in bulk. Records with
+        unsupported value combinations do not affect the others of the batch.
+
+        Args:
+            records: Records as accepted by `parse`.
+
+        Returns:
+            For each record in order, the parsed transaction or the error raised
+            while parsing it.
+        """
+        return [_try_parse(self.parse, record) for record in records]
+
+
+class RecordParser(Parser, ABC, Generic[_RecordT]):
+    """Parser validating source records against a typed record schema.
+
+    Batches of records are validated in a single call, which avoids the
+    per-call overhead of pydantic for large files. If a batch fails validation,
+    its records are validated one by one so the failing record is reported.
+    Subclasses convert validated records in `_parse_validated`.
+    """
+
+    def __init__(self, record_type: type[_RecordT]) -> None:
+        """Initialize the parser.
+
+        Args:
+            record_type: TypedDict describing the fields of a source record.
+        """
+        self.__record_type: type[_RecordT] = record_type
+        # built on first use, which dominates the setup of unused importers
+        self.__validators: (
+            tuple[TypeAdapter[_RecordT], TypeAdapter[list[_RecordT]]] | None
+        ) = None
+
+    def __getstate__(self) -> dict[str, object]:
+        """Get the state for pickling, without the compiled validators.
+
+        Returns:
+            The attributes of the parser, the validators being rebuilt on use.
+        """
+        state: dict[str, object] = vars(self).copy()
+        state["_RecordParser__validators"] = None
+        return state
+
+    @override
+    def parse(self, record: dict[str, str]) -> Transaction:
+        validator, _ = self.__get_validators()
+        return self._parse_validated(validator.validate_python(record))
+
+    @override
+    def parse_many(
+        self, records: Sequence[dict[str, str]]
+    ) -> list[Transaction | ParserError]:
+        try:
+            _, batch_validator = self.__get_validators()
+            validated = batch_validator.validate_python(records)
+        except ValidationError:
+            return super().parse_many(records)
+        return [_try_parse(self._parse_validated, record) for record in validated]
+
+    @abstractmethod
+    def _parse_validated(self, validated: _RecordT) -> Transaction:
+        """Convert a validated record into a Beancount-compatible structure.
+
+        Args:
+            validated: Record validated against the record schema.
+
+        Raises:
+            ParserError: If the record contains unsupported value combinations.
+
+        Returns:
+            Transaction object with the parsed data.
+        """
+
+    def __get_validators(
+        self,
+    ) -> tuple[TypeAdapter[_RecordT], TypeAdapter[list[_RecordT]]]:
+        if self.__validators is None:
+            record_type = self.__record_type
+            self.__validators = (
+                TypeAdapter(record_type),
+                TypeAdapter[list[_RecordT]](
+                    list[record_type]  # pyright: ignore[reportInvalidTypeForm]
+                ),
+            )
+        return self.__validators
+
+
+def _try_parse(
+    parse: Callable[[_T], Transaction], record: _T
+) -> Transaction | ParserError:
+    try:
+        return parse(record)
+    except ParserError as e:
+        return e
+
+
+class DecoderCacheInfo(NamedTuple):
+    """Statistics of the cache of a memoized field decoder.
+
+    Attributes:
+        hits: Number of values found in the cache.
+        misses: Number of values decoded.
+        size: Number of values currently cached.
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+
+def memoize_decoder(decode: Callable[[str], _T], /) -> Callable[[str], _T]:
+    """Memoize a decoder of field values in the shared decoder cache.
+
+    Statements repeat many values, such as dates, times of day and amounts, so
+    decoded values are kept in a bounded least recently used cache per decoder.
+    Decoded values must be immutable since they are shared between records.
+    Usable as a decorator.
+
+    Args:
+        decode: Function decoding the string value of a field.
+
+    Returns:
+        The memoized decoder, registered for `decoder_cache_info`.
+    """
+    memoized = lru_cache(maxsize=_DECODER_CACHE_SIZE)(decode)
+
+    def cache_info() -> DecoderCacheInfo:
+        info = memoized.cache_info()
+        return DecoderCacheInfo(hits=info.hits, misses=info.misses, size=info.currsize)
+
+    _decoders[f"{decode.__module__}.{decode.__qualname__}"] = cache_info
+    return memoized
+
+
+def decoder_cache_info() -> dict[str, DecoderCacheInfo]:
+    """Report hits and misses of the memoized field decoders.
+
+    Returns:
+        Statistics of the cache of each decoder, keyed by its qualified name.
+    """
+    return {name: cache_info() for name, cache_info in _decoders.items()}
+
+
+def _type_adapter(type_: type[_T]) -> TypeAdapter[_T]:
+    # adapters are built on first use to keep importing the module cheap
+    adapter = _type_adapters.get(type_)
+    if adapter is None:
+        adapter = _type_adapters[type_] = TypeAdapter(type_)
+    return cast("TypeAdapter[_T]", adapter)
+
+
+@memoize_decoder
+def _decode_date(value: str) -> datetime.date:
+    return _type_adapter(datetime.date).validate_python(value)
+
+
+@memoize_decoder
+def _decode_time(value: str) -> datetime.time:
+    return _type_adapter(datetime.time).validate_python(value)
+
+
+@memoize_decoder
+def _decode_datetime(value: str) -> datetime.datetime:
+    return _type_adapter(datetime.datetime).validate_python(value)
+
+
+@memoize_decoder
+def _decode_decimal(value: str) -> Decimal:
+    return _type_adapter(Decimal).validate_python(value)
+
+
+DateField = Annotated[datetime.date, PlainValidator(_decode_date)]
+"""Date field decoded through the shared decoder cache."""
+
+TimeField = Annotated[datetime.time, PlainValidator(_decode_time)]
+"""Time field decoded through the shared decoder cache."""
+
+DatetimeField = Annotated[datetime.datetime, PlainValidator(_decode_datetime)]
+"""Datetime field decoded through the shared decoder cache."""
+
+DecimalField = Annotated[Decimal, PlainValidator(_decode_decimal)]
+"""Decimal field decoded through the shared decoder cache."""
+
+
+class _MetadataCache:
+    """Metadata of files, bounded in memory and optionally persisted on disk."""
+
+    def __init__(self, directory: Path | None) -> None:
+        self.__entries: OrderedDict[str, Metadata] = OrderedDict()
+        self.__store: Cache | None = None
+        if directory is not None:
+            import diskcache  # noqa: PLC0415
+
+            self.__store = diskcache.Cache(
+                directory, eviction_policy="least-recently-used"
+            )
+
+    def get(self, key: str) -> Metadata | None:
+        if (metadata := self.__entries.get(key)) is not None:
+            self.__entries.move_to_end(key)
+            return metadata
+        if self.__store is None:
+            return None
+        data = self.__store.get(key)  # pyright: ignore[reportUnknownVariableType]
+        if not isinstance(data, bytes):
+            return None
+        metadata = _type_adapter(Metadata).validate_json(data)
+        self.__remember(key, metadata)
+        return metadata
+
+    def set(self, key: str, metadata: Metadata) -> None:
+        self.__remember(key, metadata)
+        if self.__store is not None:
+            _ = self.__store.set(key, _type_adapter(Metadata).dump_json(metadata))
+
+    def __remember(self, key: str, metadata: Metadata) -> None:
+        self.__entries[key] = metadata
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > _METADATA_CACHE_SIZE:
+            _ = self.__entries.popitem(last=False)
+
+
+def _order_links(extra: Extra) -> frozenset[str]:
+    # links a payment to its refunds, which share the merchant order number
+    if not extra.merchant_order_id:
+        return frozenset()
+    return frozenset({"order-" + _LINK_INVALID_CHARS.sub("-", extra.merchant_order_id)})
+
+
+def _journaled(
+    journal: JournalEntry, record: dict[str, str], result: Transaction | ParserError
+) -> Literal["new", "revised"] | None:
+    # records which failed to parse are extracted again on later imports
+    fingerprint = journal.fingerprint(record)
+    identifier = None
+    revised = False
+    if isinstance(result, Transaction) and result.extra.transaction_id is not None:
+        # records may change between exports, e.g. when a payment is closed,
+        # only changes of the status or the postings are imported again
+        transaction_id = result.extra.transaction_id
+        identifier = journal.identify(
+            transaction_id, (result.extra.status, tuple(result.postings))
+        )
+        if identifier is None:
+            return None
+        revised = journal.is_revision(transaction_id)
+    if fingerprint is None and not revised:
+        return None
+    if isinstance(result, ParserError):
+        journal.complete = False
+    else:
+        if fingerprint is not None:
+            journal.add(fingerprint)
+        if identifier is not None:
+            journal.add(identifier)
+    return "revised" if revised else "new"
+
+
+class _TransactionIndex:
+    """Existing transactions indexed for duplicate lookups.
+
+    Transactions are indexed by date, source and the accounts and units of all
+    of their postings for exact lookups, and by account and date for lookups of
+    similar transactions within a date window. Each existing transaction is
+    the duplicate of at most one new entry per lookup pass.
+    """
+
+    def __init__(self) -> None:
+        self.__entries: Sequence[beancount.Directive] = ()
+        self.__count = 0
+        self.__exact: dict[_TransactionKey, list[beancount.Transaction]] = {}
+        self.__by_account: dict[
+            beancount.Account, tuple[list[datetime.date], list[beancount.Transaction]]
+        ] = {}
+
+    def __getstate__(self) -> dict[str, object]:
+        """Get the state for pickling, without the indexed entries.
+
+        Returns:
+            The attributes of an empty index, entries being indexed again on use.
+        """
+        return vars(_TransactionIndex()).copy()
+
+    def update(self, entries: Sequence[beancount.Directive]) -> None:
+        """Index the existing entries.
+
+        beangulp appends the entries extracted from each file to the existing
+        ones, so only entries appended to the list indexed last are added.
+        Other lists replace the indexed entries.
+
+        Args:
+            entries: The existing entries.
+        """
+        if entries is not self.__entries or len(entries) < self.__count:
+            self.__entries = entries
+            self.__count = 0
+            self.__exact = {}
+            self.__by_account = {}
+        for entry in islice(entries, self.__count, None):
+            if isinstance(entry, beancount.Transaction):
+                self.__add(entry)
+        self.__count = len(entries)
+
+    def find(
+        self,
+        entry: beancount.Transaction,
+        compare: Callable[[beancount.Directive, beancount.Directive], bool],
+        window: datetime.timedelta,
+        matched: set[int],
+    ) -> beancount.Transaction | None:
+        """Find an existing transaction the entry is a duplicate of.
+
+        Args:
+            entry: The newly extracted transaction.
+            compare: Comparison of similar transactions.
+            window: Date window of similar transactions.
+            matched: Ids of the existing transactions already found as
+                duplicates, updated with the one found.
+
+        Returns:
+            The existing transaction, or None if there is no duplicate.
+        """
+        source = _source_key(entry)
+        target = self.__find_exact(entry, source, matched)
+        if target is None:
+            target = self.__find_similar(entry, source, compare, window, matched)
+        if target is not None:
+            matched.add(id(target))
+        return target
+
+    def __find_exact(
+        self, entry: beancount.Transaction, source: str | None, matched: set[int]
+    ) -> beancount.Transaction | None:
+        keys = [_transaction_key(entry, source)]
+        if source is not None:
+            # existing entries without any source, e.g. entered by hand
+            keys.append(_transaction_key(entry, None))
+        for key in keys:
+            for target in self.__exact.get(key, ()):
+                if id(target) not in matched:
+                    return target
+        return None
+
+    def __find_similar(
+        self,
+        entry: beancount.Transaction,
+        source: str | None,
+        compare: Callable[[beancount.Directive, beancount.Directive], bool],
+        window: datetime.timedelta,
+        matched: set[int],
+    ) -> beancount.Transaction | None:
+        for account in dict.fromkeys(account for _, account, _ in _posting_keys(entry)):
+            if account not in self.__by_account:
+                continue
+            dates, transactions = self.__by_account[account]
+            lo = bisect_left(dates, entry.date - window)
+            hi = bisect_right(dates, entry.date + window)
+            for target in transactions[lo:hi]:
+                if id(target) in matched:
+                    continue
+                # records of different sources are never duplicates
+                other = _source_key(target)
+                if source is not None and other is not None and other != source:
+                    continue
+                if compare(entry, target):
+                    return target
+        return None
+
+    def __add(self, entry: beancount.Transaction) -> None:
+        key = _transaction_key(entry, _source_key(entry))
+        self.__exact.setdefault(key, []).append(entry)
+        for account in dict.fromkeys(account for _, account, _ in _posting_keys(entry)):
+            dates, transactions = self.__by_account.setdefault(account, ([], []))
+            # ledgers are sorted by date, so entries are mostly appended
+            position = bisect_right(dates, entry.date)
+            dates.insert(position, entry.date)
+            transactions.insert(position, entry)
+
+
+class _BalanceAssertions:
+    """Balance assertions of the records of a file being extracted.
+
+    With `end_of_day`, only the balance of the last record of each account on
+    each date is asserted. Records are expected in chronological order, or in
+    reverse chronological order if `reverse`, so the balances of earlier
+    records of a date are dropped before being built, and the remaining ones
+    are built once the records move to another date.
+    """
+
+    def __init__(self, *, end_of_day: bool, reverse: bool) -> None:
+        self.__end_of_day = end_of_day
+        self.__reverse = reverse
+        self.__date: datetime.date | None = None
+        self.__pending: dict[str | None, Callable[[], beancount.Balance]] = {}
+
+    def advance(self, date: datetime.date) -> list[beancount.Balance]:
+        """Move to the date of the next record.
+
+        Args:
+            date: Date of the record.
+
+        Returns:
+            The balances of the previous date, if the date changed.
+        """
+        if not self.__end_of_day or date == self.__date:
+            return []
+        self.__date = date
+        return self.flush()
+
+    def add(
+        self, account: str | None, build: Callable[[], beancount.Balance]
+    ) -> list[beancount.Balance]:
+        """Add the balance of a record.
+
+        Args:
+            account: Source account of the balance.
+            build: Function building the balance assertion.
+
+        Returns:
+            The balances to emit immediately.
+        """
+        if not self.__end_of_day:
+            return [build()]
+        if not (self.__reverse and account in self.__pending):
+            self.__pending[account] = build
+        return []
+
+    def flush(self) -> list[beancount.Balance]:
+        """Build the pending balances.
+
+        Returns:
+            The balances of the current date.
+        """
+        balances = [build() for build in self.__pending.values()]
+        self.__pending.clear()
+        return balances
+
+
+class _BalanceChain:
+    """Running balances of the records of a file being extracted.
+
+    The balance of each record must follow from the balance of the previous
+    record of the same account and currency and the amount of the record, in
+    chronological order or in reverse chronological order if `reverse`. The
+    chain is checked in a single pass while the records are read.
+    """
+
+    def __init__(self, *, reverse: bool) -> None:
+        self.__reverse = reverse
+        self.__previous: dict[
+            tuple[str | None, str | None], tuple[Decimal, Decimal]
+        ] = {}
+
+    def verify(self, result: Transaction | ParserError) -> str | None:
+        """Verify the balance of the next record.
+
+        Args:
+            result: The parsed record.
+
+        Returns:
+            A message if the balance breaks the chain, otherwise None.
+        """
+        if isinstance(result, ParserError):
+            # the balance of the record is unknown
+            self.__previous.clear()
+            return None
+        balance = result.balance
+        if balance is None:
+            return None
+        key = (balance.account, balance.currency)
+        amount = sum(
+            (
+                posting.amount
+                for posting in result.postings
+                if (posting.account, posting.currency) == key
+            ),
+            Decimal(0),
+        )
+        previous = self.__previous.get(key)
+        self.__previous[key] = (balance.amount, amount)
+        if previous is None:
+            return None
+        previous_balance, previous_amount = previous
+        if self.__reverse:
+            expected = previous_balance - previous_amount
+        else:
+            expected = previous_balance + amount
+        if balance.amount == expected:
+            return None
+        return (
+            f"balance {balance.amount} breaks the running balance, expected {expected}"
+        )
+
+
+_TransactionKey = tuple[
+    datetime.date,
+    frozenset[tuple[tuple[beancount.Account, beancount.Amount], int]],
+    str | None,
+]
+
+
+def _posting_keys(
+    entry: beancount.Transaction,
+) -> Iterator[tuple[datetime.date, beancount.Account, beancount.Amount]]:
+    for posting in entry.postings:
+        if isinstance(posting.units, beancount.Amount):
+            yield entry.date, posting.account, posting.units
+
+
+def _transaction_key(
+    entry: beancount.Transaction, source: str | None
+) -> _TransactionKey:
+    postings = Counter((account, units) for _, account, units in _posting_keys(entry))
+    return entry.date, frozenset(postings.items()), source
+
+
+def _record_date(entry: beancount.Directive) -> datetime.date:
+    # balances are dated the day after the record they are extracted from
+    if isinstance(entry, beancount.Balance):
+        return entry.date - datetime.timedelta(days=1)
+    return entry.date
+
+
+def _source_key(entry: beancount.Directive) -> str | None:
+    # identifiers are kept in printed ledgers, unlike the source records
+    for key in ("transaction_id", "__source__"):
+        source = entry.meta.get(key)
+        if isinstance(source, str):
+            return source
+    return None
+
+
+class SourceReference(NamedTuple):
+    """Compact reference to the source record of an entry.
+
+    Attributes:
+        digest: Content hash of the file the record was read from.
+        position: Position of the record in the file, starting from 0.
+    """
+
+    digest: str
+    position: int
+
 
 class ImporterKwargs(TypedDict):
     """Configuration parameters for the Importer class.
@@ -198,10 +796,36 @@ class ImporterKwargs(TypedDict):
 
         currency_mapping: Mapping of source currency identifiers to Beancount currency
             codes (e.g., {"RMB": "CNY", "USD": "USD"}).
+        cache_dir: Optional directory to cache parsed files and their metadata
+            in, so unchanged files are not parsed again on later runs. Requires
+            the `cache` extra.
+        journal_dir: Optional directory of the import journal. Files imported
+            before are skipped, and only records not imported before are
+            extracted from the others. Requires the `cache` extra.
+        source_metadata: What the `__source__` metadata of entries holds:
+            - "record" (default): the whole source record as a string
+            - "reference": a `SourceReference` to the record, resolved with
+              `Importer.source_record`
+            - a sequence of field names: these fields of the record only
+            - None: no `__source__` metadata
+        balance_assertions: Which balances of the records are asserted:
+            - "end_of_day" (default): the balance of the last record of each
+              account on each date
+            - "all": the balance of every record, all but the last one of a
+              date being marked as duplicates
+        verify_balances: Whether to check that the balance of each record
+            follows from the previous one and its amount. Transactions
+            breaking the chain, e.g. after missing or misread records, are
+            flagged with an `error` metadata. Defaults to True.
     """
 
     account_mapping: Mapping[str | None, Mapping[str | None, beancount.Account]]
     currency_mapping: Mapping[str | None, beancount.Currency]
+    cache_dir: NotRequired[Path]
+    journal_dir: NotRequired[Path]
+    source_metadata: NotRequired[Literal["record", "reference"] | Sequence[str] | None]
+    balance_assertions: NotRequired[Literal["end_of_day", "all"]]
+    verify_balances: NotRequired[bool]
 
 
 class Importer(beangulp.Importer):
@@ -213,7 +837,7 @@ class Importer(beangulp.Importer):
 
     def __init__(
         self,
-        filename: Pattern[str],
+        filename: re.Pattern[str],
         reader: Reader,
         parser: Parser,
         /,
@@ -231,14 +855,63 @@ class Importer(beangulp.Importer):
             parser: Parser instance for converting records to transactions.
             **kwargs: Additional configuration including account and currency mappings.
         """
+        if (cache_dir := kwargs.get("cache_dir")) is not None:
+            from beancount_daoru.readers import cached  # noqa: PLC0415
+
+            reader = cached.Reader(reader, directory=cache_dir / "readers")
+        self.__metadata_cache = _MetadataCache(
+            None if cache_dir is None else cache_dir / "metadata"
+        )
+        source_metadata = kwargs.get("source_metadata", "record")
+        if isinstance(source_metadata, str) and source_metadata not in (
+            "record",
+            "reference",
+        ):
+            msg = f"unsupported source metadata mode: {source_metadata!r}"
+            raise ValueError(msg)
+        self.__source_metadata = source_metadata
+        balance_assertions = kwargs.get("balance_assertions", "end_of_day")
+        if balance_assertions not in ("end_of_day", "all"):
+            msg = f"unsupported balance assertions mode: {balance_assertions!r}"
+            raise ValueError(msg)
+        self.__balance_assertions = balance_assertions
+        self.__verify_balances = kwargs.get("verify_balances", True)
+        self.__journal = None
+        if (journal_dir := kwargs.get("journal_dir")) is not None:
+            self.__journal = Journal(journal_dir)
         self.__filename_pattern = filename
+        self.__dispatcher: Callable[[str], Container[Importer]] | None = None
         self.__reader = reader
         self.__parser = parser
         self.__account_mappings = kwargs["account_mapping"]
         self.__currency_mapping = kwargs["currency_mapping"]
+        # reused by later calls while the existing entries are only appended to
+        self.__index = _TransactionIndex()
+
+    @property
+    def filename_pattern(self) -> re.Pattern[str]:
+        """Pattern the names of files handled by this importer match.
+
+        Returns:
+            The filename pattern.
+        """
+        return self.__filename_pattern
+
+    def use_dispatcher(
+        self, candidates: Callable[[str], Container["Importer"]]
+    ) -> None:
+        """Identify files through a dispatcher shared with other importers.
+
+        Args:
+            candidates: Function finding the importers handling a file, e.g.
+                `beancount_daoru.dispatch.Dispatcher.candidates`.
+        """
+        self.__dispatcher = candidates
 
     @override
     def identify(self, filepath: str) -> bool:
+        if self.__dispatcher is not None:
+            return self in self.__dispatcher(filepath)
         return self.__filename_pattern.fullmatch(Path(filepath).name) is not None
 
     @override
@@ -259,16 +932,148 @@ class Importer(beangulp.Importer):
         filepath: str,
         existing: beancount.Directives,
     ) -> beancount.Directives:
-        metadata = self._cached_metadata(filepath)
-        directives: list[beancount.Directive] = []
-        for index, record in enumerate(self.__reader.read_records(Path(filepath))):
-            directives.extend(self._extract_record(filepath, index, metadata, record))
-        return directives
+        return list(self._iter_extract(filepath))
+
+    def stream(
+        self, filepath: str, existing: beancount.Directives
+    ) -> Iterator[beancount.Directive]:
+        """Extract entries from a file while it is read.
+
+        Unlike `extract`, entries are sorted and deduplicated against the
+        existing entries in windows of consecutive records of the same date,
+        so memory stays bounded regardless of the length of the file. Windows
+        are produced in the order of the file.
+
+        Args:
+            filepath: Path of the file.
+            existing: Existing entries for deduplication.
+
+        Yields:
+            The extracted entries.
+        """
+        self.__index.update(existing)
+        matched: set[int] = set()
+        for _, group in groupby(self._iter_extract(filepath), key=_record_date):
+            window = list(group)
+            self.sort(window)
+            self._deduplicate(window, matched)
+            yield from window
 
     @override
     def deduplicate(
         self, entries: beancount.Directives, existing: beancount.Directives
     ) -> None:
+        self.__index.update(existing)
+        self._deduplicate(entries, set())
+
+    @override
+    def sort(self, entries: beancount.Directives, reverse: bool = False) -> None:
+        def sort_key(entry: beancount.Directive) -> tuple[int, int]:
+            lineno = entry.meta["lineno"]  # pyright: ignore[reportAny]
+            return (
+                self._lineno_key(lineno),  # pyright: ignore[reportAny]
+                0 if isinstance(entry, beancount.Transaction) else 1,
+            )
+
+        entries.sort(key=sort_key, reverse=reverse)
+
+    def _journal_namespace(self, metadata: Metadata) -> str:
+        parser = type(self.__parser)
+        return f"{parser.__module__}.{parser.__qualname__}:{metadata.account}"
+
+    def source_record(
+        self, filepath: str, reference: SourceReference
+    ) -> dict[str, str]:
+        """Read the source record an entry refers to.
+
+        Args:
+            filepath: Path of the file the entry was extracted from.
+            reference: The `__source__` metadata of the entry.
+
+        Returns:
+            The source record.
+
+        Raises:
+            ValueError: If the file is not the one the entry was extracted from.
+        """
+        if file_digest(Path(filepath)) != reference.digest:
+            msg = f"file changed since the entry was extracted: {filepath!r}"
+            raise ValueError(msg)
+        with self.__reader.read(Path(filepath)) as document:
+            record = next(islice(document.records, reference.position, None), None)
+        if record is None:
+            msg = f"record not found: {reference!r}"
+            raise ValueError(msg)
+        return record
+
+    def _iter_extract(self, filepath: str) -> Iterator[beancount.Directive]:
+        digest = None
+        if self.__journal is not None or self.__source_metadata == "reference":
+            digest = file_digest(Path(filepath))
+        if (
+            self.__journal is not None
+            and digest is not None
+            and self.__journal.is_imported(digest)
+        ):
+            return
+        key = self._metadata_key(filepath)
+        with self.__reader.read(Path(filepath)) as document:
+            metadata = self.__metadata_cache.get(key)
+            if metadata is None:
+                metadata = self.__parser.extract_metadata(document.captions)
+                self.__metadata_cache.set(key, metadata)
+            with (
+                nullcontext()
+                if self.__journal is None or digest is None
+                else self.__journal.importing(digest, self._journal_namespace(metadata))
+            ) as journal:
+                balances = _BalanceAssertions(
+                    end_of_day=self.__balance_assertions == "end_of_day",
+                    reverse=self.__parser.reversed,
+                )
+                chain = None
+                if self.__verify_balances:
+                    chain = _BalanceChain(reverse=self.__parser.reversed)
+                lineno = 0
+                while batch := list(islice(document.records, _BATCH_SIZE)):
+                    for record, result in zip(
+                        batch, self.__parser.parse_many(batch), strict=True
+                    ):
+                        # records imported before still continue the chain
+                        error = None if chain is None else chain.verify(result)
+                        state = (
+                            "new"
+                            if journal is None
+                            else _journaled(journal, record, result)
+                        )
+                        if state == "revised":
+                            error = (
+                                _REVISED_MESSAGE
+                                if error is None
+                                else f"{error}; {_REVISED_MESSAGE}"
+                            )
+                        if state is not None:
+                            yield from self._extract_record(
+                                filepath,
+                                lineno,
+                                metadata,
+                                record,
+                                result,
+                                self._source(record, digest, lineno),
+                                balances,
+                                error,
+                            )
+                        lineno += 1
+                yield from balances.flush()
+
+    def _deduplicate(self, entries: beancount.Directives, matched: set[int]) -> None:
+        for entry in entries:
+            if not isinstance(entry, beancount.Transaction):
+                continue
+            target = self.__index.find(entry, self.cmp, _DUPLICATE_WINDOW, matched)
+            if target is not None:
+                entry.meta[DUPLICATE] = target
+
         balances = sorted(
             (e for e in entries if isinstance(e, beancount.Balance)),
             key=attrgetter("date"),
@@ -282,42 +1087,45 @@ class Importer(beangulp.Importer):
             if (target := max_balance_per_date[balance.date]) != balance:
                 balance.meta[DUPLICATE] = target
 
-    @override
-    def sort(self, entries: beancount.Directives, reverse: bool = False) -> None:
-        def sort_key(entry: beancount.Directive) -> tuple[int, int]:
-            lineno = entry.meta["lineno"]  # pyright: ignore[reportAny]
-            return (
-                self._lineno_key(lineno),  # pyright: ignore[reportAny]
-                0 if isinstance(entry, beancount.Transaction) else 1,
-            )
-
-        entries.sort(key=sort_key, reverse=reverse)
-
     def _lineno_key(self, lineno: int) -> int:
         return -lineno if self.__parser.reversed else lineno
 
-    @lru_cache(maxsize=1)  # noqa: B019
     def _cached_metadata(self, filepath: str) -> Metadata:
-        return self.__parser.extract_metadata(
-            self.__reader.read_captions(Path(filepath))
+        key = self._metadata_key(filepath)
+        metadata = self.__metadata_cache.get(key)
+        if metadata is None:
+            with self.__reader.read(Path(filepath)) as document:
+                metadata = self.__parser.extract_metadata(document.captions)
+            self.__metadata_cache.set(key, metadata)
+        return metadata
+
+    def _metadata_key(self, filepath: str) -> str:
+        path = Path(filepath).resolve()
+        stat = path.stat()
+        parser = type(self.__parser)
+        return (
+            f"{path}:{stat.st_mtime_ns}:{stat.st_size}:{self.__reader!r}:"
+            f"{parser.__module__}.{parser.__qualname__}"
         )
 
-    def _extract_record(
+    def _extract_record(  # noqa: PLR0913, PLR0917
         self,
         filepath: str,
         lineno: int,
         metadata: Metadata,
         record: dict[str, str],
+        transaction: Transaction | ParserError,
+        source: object | None,
+        balances: _BalanceAssertions,
+        error: str | None,
     ) -> Iterator[beancount.Directive]:
-        try:
-            transaction = self.__parser.parse(record)
-        except ParserError as e:
+        if isinstance(transaction, ParserError):
             yield beancount.Transaction(
                 meta=self._build_meta(
                     filepath,
                     lineno,
-                    record,
-                    error=f"{e} @ {record!r}",
+                    source,
+                    error=f"{transaction} @ {record!r}",
                 ),
                 date=datetime.date(1970, 1, 1),
                 flag=beancount.FLAG_WARNING,
@@ -329,19 +1137,21 @@ class Importer(beangulp.Importer):
             )
             return
 
+        yield from balances.advance(transaction.date)
         yield beancount.Transaction(
             meta=self._build_meta(
                 filepath,
                 lineno,
-                record,
+                source,
                 **transaction.extra._asdict(),  # pyright: ignore[reportAny]
+                error=error,
             ),
             date=transaction.date,
-            flag=beancount.FLAG_OKAY,
+            flag=beancount.FLAG_OKAY if error is None else beancount.FLAG_WARNING,
             payee=transaction.payee,
             narration=transaction.narration,
             tags=frozenset(),
-            links=frozenset(),
+            links=_order_links(transaction.extra),
             postings=[
                 beancount.Posting(
                     account=self._analyse_account(metadata, posting),
@@ -356,34 +1166,61 @@ class Importer(beangulp.Importer):
         )
 
         if transaction.balance is not None:
-            yield beancount.Balance(
-                meta=self._build_meta(filepath, lineno, record),
-                date=transaction.date + datetime.timedelta(days=1),
-                account=self._analyse_account(metadata, transaction.balance),
-                amount=self._analyse_amount(metadata, transaction.balance),
-                tolerance=None,
-                diff_amount=None,
+            yield from balances.add(
+                transaction.balance.account,
+                partial(
+                    self._extract_balance,
+                    filepath,
+                    lineno,
+                    metadata,
+                    transaction.date,
+                    transaction.balance,
+                    source,
+                ),
             )
 
+    def _extract_balance(  # noqa: PLR0913, PLR0917
+        self,
+        filepath: str,
+        lineno: int,
+        metadata: Metadata,
+        date: datetime.date,
+        balance: Posting,
+        source: object | None,
+    ) -> beancount.Balance:
+        return beancount.Balance(
+            meta=self._build_meta(filepath, lineno, source),
+            date=date + datetime.timedelta(days=1),
+            account=self._analyse_account(metadata, balance),
+            amount=self._analyse_amount(metadata, balance),
+            tolerance=None,
+            diff_amount=None,
+        )
+
     def _build_meta(
         self,
         filepath: str,
         lineno: int,
-        record: dict[str, str],
+        source: object | None,
         **meta: object | None,
-    ) -> dict[str, str]:
-        return beancount.new_metadata(
-            self.filename(filepath),
-            lineno,
-            kvlist={
-                key: str(value)
-                for key, value in {
-                    "__source__": str(record),
-                    **meta,
-                }.items()
-                if value is not None
-            },
+    ) -> beancount.Meta:
+        kvlist: beancount.Meta = {} if source is None else {"__source__": source}
+        kvlist.update(
+            (key, str(value)) for key, value in meta.items() if value is not None
         )
+        return beancount.new_metadata(self.filename(filepath), lineno, kvlist=kvlist)
+
+    def _source(
+        self, record: dict[str, str], digest: str | None, lineno: int
+    ) -> object | None:
+        mode = self.__source_metadata
+        if mode is None:
+            return None
+        if mode == "record":
+            return str(record)
+        if mode == "reference":
+            return None if digest is None else SourceReference(digest, lineno)
+        return str({field: record[field] for field in mode if field in record})
 
     def _analyse_account(
         self,
@@ -5,25 +5,27 @@ Alipay transactions into Beancount entries.
 """
 
 import re
-from collections.abc import Iterator
-from datetime import date, datetime
+from collections.abc import Iterable, Iterator
+from datetime import date
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, NamedTuple
 
-from pydantic import AfterValidator, TypeAdapter
-from typing_extensions import TypedDict, Unpack, override
+from pydantic import AfterValidator
+from typing_extensions import NotRequired, TypedDict, Unpack, override
 
 from beancount_daoru.importer import (
+    DatetimeField,
+    DecimalField,
     Extra,
     ImporterKwargs,
     Metadata,
-    ParserError,
     Posting,
+    RecordParser,
     Transaction,
 )
 from beancount_daoru.importer import Importer as BaseImporter
-from beancount_daoru.importer import Parser as BaseParser
 from beancount_daoru.readers import excel
+from beancount_daoru.rules import Affix, Rule, RuleTable
 from beancount_daoru.utils import search_patterns
 
 
@@ -41,21 +43,67 @@ StrField = Annotated[str | None, AfterValidator(_validate_str)]
 Record = TypedDict(
     "Record",
     {
-        "交易时间": datetime,
+        "交易时间": DatetimeField,
         "交易分类": StrField,
         "交易对方": StrField,
         "对方账号": StrField,
         "商品说明": StrField,
         "收/支": StrField,
-        "金额": Decimal,
+        "金额": DecimalField,
         "收/付款方式": str,
         "交易状态": StrField,
+        "交易订单号": NotRequired[StrField],
+        "商家订单号": NotRequired[StrField],
         "备注": StrField,
     },
 )
 
 
-class Parser(BaseParser):
+class Flow(NamedTuple):
+    """Action of a rule describing how the amount of a record flows.
+
+    Attributes:
+        outflow: Whether the amount leaves the payment method.
+        counter_party: Account receiving the amount, if tracked.
+    """
+
+    outflow: bool
+    counter_party: str | None = None
+
+
+_RULES = RuleTable[Flow | None](
+    ("收/支", "交易状态"),
+    [
+        (("支出", {"交易成功", "等待确认收货", "交易关闭"}), Flow(outflow=True)),
+        (({"收入", "不计收支"}, "交易关闭"), None),
+        (("收入", "交易成功"), Flow(outflow=False)),
+        (("不计收支", "退款成功"), Flow(outflow=False)),
+        (
+            ("不计收支", "交易成功"),
+            RuleTable(
+                ("商品说明",),
+                [
+                    (("提现-实时提现",), Flow(outflow=False)),
+                    (("余额宝-更换货基转入",), Flow(outflow=False)),
+                    (
+                        (
+                            {
+                                "余额宝-单次转入",
+                                "余额宝-安心自动充-自动攒入",
+                                "余额宝-自动转入",
+                            },
+                        ),
+                        Flow(outflow=True, counter_party="余额宝"),
+                    ),
+                    ((Affix("余额宝-", "-收益发放"),), Flow(outflow=False)),
+                ],
+            ),
+        ),
+    ],
+)
+
+
+class Parser(RecordParser[Record]):
     """Parser for Alipay transaction records.
 
     Implements the Parser protocol to convert Alipay transaction records
@@ -63,12 +111,21 @@ class Parser(BaseParser):
     and logic for determining transaction amounts and directions.
     """
 
-    __validator = TypeAdapter(Record)
     __account_pattern = re.compile(r"支付宝账户：(\S+)")  # noqa: RUF001
     __date_pattern = re.compile(
         r"终止时间：\[(\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2}]"  # noqa: RUF001
     )
 
+    def __init__(self, rules: Iterable[Rule[Flow | None]] = ()) -> None:
+        """Initialize the parser.
+
+        Args:
+            rules: Additional rules on (收/支, 交易状态), taking precedence over
+                the built-in ones. An action of None skips the postings.
+        """
+        super().__init__(Record)
+        self.__rules = _RULES.extended(rules)
+
     @property
     @override
     def reversed(self) -> bool:
@@ -85,8 +142,7 @@ class Parser(BaseParser):
         )
 
     @override
-    def parse(self, record: dict[str, str]) -> Transaction:
-        validated = self.__validator.validate_python(record)
+    def _parse_validated(self, validated: Record) -> Transaction:
         postings = ()
         if amount_and_payee := self._parse_amount(validated):
             amount, payee = amount_and_payee
@@ -112,42 +168,20 @@ class Parser(BaseParser):
                 payee_account=validated["对方账号"],
                 type=validated["交易分类"],
                 remarks=validated["备注"],
+                transaction_id=validated.get("交易订单号"),
+                merchant_order_id=validated.get("商家订单号"),
             ),
             payee=validated["交易对方"],
             narration=validated["商品说明"],
             postings=postings,
         )
 
-    def _parse_amount(self, validated: Record) -> tuple[Decimal, str | None] | None:  # noqa: PLR0911
-        dc_key = "收/支"
-        status_key = "交易状态"
-        desc_key = "商品说明"
-        amount = validated["金额"]
-        match (validated[dc_key], validated[status_key]):
-            case ("支出", "交易成功" | "等待确认收货" | "交易关闭"):
-                return -amount, None
-            case ("收入" | "不计收支", "交易关闭"):
-                return None
-            case ("收入", "交易成功") | ("不计收支", "退款成功"):
-                return amount, None
-            case ("不计收支", "交易成功"):
-                match validated[desc_key]:
-                    case "提现-实时提现":
-                        return amount, None
-                    case "余额宝-更换货基转入":
-                        return amount, None
-                    case (
-                        "余额宝-单次转入"
-                        | "余额宝-安心自动充-自动攒入"
-                        | "余额宝-自动转入"
-                    ):
-                        return -amount, "余额宝"
-                    case str(x) if x.startswith("余额宝-") and x.endswith("-收益发放"):
-                        return amount, None
-                    case _:
-                        raise ParserError(dc_key, status_key, desc_key)
-            case _:
-                raise ParserError(dc_key, status_key)
+    def _parse_amount(self, validated: Record) -> tuple[Decimal, str | None] | None:
+        flow, _ = self.__rules.lookup(validated)
+        if flow is None:
+            return None
+        amount = -validated["金额"] if flow.outflow else validated["金额"]
+        return amount, flow.counter_party
 
 
 class Importer(BaseImporter):
@@ -157,15 +191,21 @@ class Importer(BaseImporter):
     parser implementation.
     """
 
-    def __init__(self, **kwargs: Unpack[ImporterKwargs]) -> None:
+    def __init__(
+        self,
+        *,
+        rules: Iterable[Rule[Flow | None]] = (),
+        **kwargs: Unpack[ImporterKwargs],
+    ) -> None:
         """Initialize the Alipay importer.
 
         Args:
+            rules: Additional rules for classifying transactions, see `Parser`.
             **kwargs: Additional configuration parameters.
         """
         super().__init__(
             re.compile(r"支付宝交易明细\(\d{8}-\d{8}\).csv"),
             excel.Reader(header=24, encoding="gbk"),
-            Parser(),
+            Parser(rules),
             **kwargs,
         )
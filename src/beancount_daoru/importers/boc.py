@@ -6,27 +6,31 @@ Bank of China transactions into Beancount entries.
 
 import re
 from collections.abc import Iterator
-from datetime import date, time
+from datetime import date
 from decimal import Decimal
 from typing import Annotated
 
-from pydantic import AfterValidator, BeforeValidator, TypeAdapter
+from pydantic import AfterValidator, PlainValidator
 from typing_extensions import TypedDict, Unpack, override
 
 from beancount_daoru.importer import (
+    DateField,
     Extra,
     ImporterKwargs,
     Metadata,
     Posting,
+    RecordParser,
+    TimeField,
     Transaction,
+    memoize_decoder,
 )
 from beancount_daoru.importer import Importer as BaseImporter
-from beancount_daoru.importer import Parser as BaseParser
 from beancount_daoru.readers import pdf_table
 from beancount_daoru.utils import search_patterns
 
 
-def _amount_validator(v: str) -> Decimal:
+@memoize_decoder
+def _decode_amount(v: str) -> Decimal:
     return Decimal(v.replace(",", ""))
 
 
@@ -39,15 +43,15 @@ def _validate_str(v: str | None) -> str | None:
     return v
 
 
-DecimalField = Annotated[Decimal, BeforeValidator(_amount_validator)]
+DecimalField = Annotated[Decimal, PlainValidator(_decode_amount)]
 StrField = Annotated[str | None, AfterValidator(_validate_str)]
 
 
 Record = TypedDict(
     "Record",
     {
-        "记账日期": date,
-        "记账时间": time,
+        "记账日期": DateField,
+        "记账时间": TimeField,
         "币别": str,
         "金额": DecimalField,
         "余额": DecimalField,
@@ -60,7 +64,7 @@ Record = TypedDict(
 )
 
 
-class Parser(BaseParser):
+class Parser(RecordParser[Record]):
     """Parser for Bank of China transaction records.
 
     Implements the Parser protocol to convert Bank of China transaction records
@@ -68,12 +72,15 @@ class Parser(BaseParser):
     logic for determining transaction amounts and directions.
     """
 
-    __validator = TypeAdapter(Record)
     __account_pattern = re.compile(r"借记卡号：\s+(\d{19})\s+")  # noqa: RUF001
     __date_pattern = re.compile(
         r"交易区间：\s*\d{4}-\d{2}-\d{2}\s*至\s*(\d{4}-\d{2}-\d{2})"  # noqa: RUF001
     )
 
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__(Record)
+
     @property
     @override
     def reversed(self) -> bool:
@@ -90,8 +97,7 @@ class Parser(BaseParser):
         )
 
     @override
-    def parse(self, record: dict[str, str]) -> Transaction:
-        validated = self.__validator.validate_python(record)
+    def _parse_validated(self, validated: Record) -> Transaction:
         return Transaction(
             date=validated["记账日期"],
             extra=Extra(
@@ -99,6 +105,7 @@ class Parser(BaseParser):
                 type=validated["交易名称"],
                 payee_account=validated["对方卡号/账号"],
                 place=validated["渠道"],
+                transaction_id=self._parse_transaction_id(validated),
             ),
             payee=validated["对方账户名"],
             narration=validated["附言"],
@@ -114,6 +121,15 @@ class Parser(BaseParser):
             ),
         )
 
+    def _parse_transaction_id(self, validated: Record) -> str:
+        # statements carry no serial numbers, while the running balance tells
+        # apart transactions at the same time
+        date = validated["记账日期"]
+        time = validated["记账时间"]
+        amount = validated["金额"]
+        balance = validated["余额"]
+        return f"{date:%Y%m%d}{time:%H%M%S}/{amount}/{balance}"
+
 
 class Importer(BaseImporter):
     """Importer for Bank of China bill files.
@@ -122,15 +138,28 @@ class Importer(BaseImporter):
     the Bank of China parser implementation.
     """
 
-    def __init__(self, **kwargs: Unpack[ImporterKwargs]) -> None:
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        learn_template: bool = False,
+        **kwargs: Unpack[ImporterKwargs],
+    ) -> None:
         """Initialize the Bank of China importer.
 
         Args:
+            workers: Number of processes extracting PDF pages in parallel.
+            learn_template: Whether to learn the column layout of the table from
+                the first page and skip table detection on the others.
             **kwargs: Additional configuration parameters.
         """
         super().__init__(
             re.compile(r"交易流水明细\d{14}\.pdf"),
-            pdf_table.Reader(table_bbox=(0, 125, 842, 420)),
+            pdf_table.Reader(
+                table_bbox=(0, 125, 842, 420),
+                workers=workers,
+                learn_template=learn_template,
+            ),
             Parser(),
             **kwargs,
         )
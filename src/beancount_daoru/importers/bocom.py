@@ -6,28 +6,32 @@ Bank of Communications transactions into Beancount entries.
 
 import re
 from collections.abc import Iterator
-from datetime import date, time
+from datetime import date
 from decimal import Decimal
 from typing import Annotated
 
-from pydantic import AfterValidator, BeforeValidator, TypeAdapter
+from pydantic import AfterValidator, PlainValidator
 from typing_extensions import TypedDict, Unpack, override
 
 from beancount_daoru.importer import (
+    DateField,
     Extra,
     ImporterKwargs,
     Metadata,
     ParserError,
     Posting,
+    RecordParser,
+    TimeField,
     Transaction,
+    memoize_decoder,
 )
 from beancount_daoru.importer import Importer as BaseImporter
-from beancount_daoru.importer import Parser as BaseParser
 from beancount_daoru.readers import pdf_table
 from beancount_daoru.utils import search_patterns
 
 
-def _amount_validator(v: str) -> Decimal:
+@memoize_decoder
+def _decode_amount(v: str) -> Decimal:
     return Decimal(v.replace(",", ""))
 
 
@@ -37,15 +41,15 @@ def _validate_str(v: str | None) -> str | None:
     return v.replace("\n", "") or None
 
 
-DecimalField = Annotated[Decimal, BeforeValidator(_amount_validator)]
+DecimalField = Annotated[Decimal, PlainValidator(_decode_amount)]
 StrField = Annotated[str | None, AfterValidator(_validate_str)]
 
 
 Record = TypedDict(
     "Record",
     {
-        "Trans Date\n交易日期": date,
-        "Trans Time\n交易时间": time,
+        "Trans Date\n交易日期": DateField,
+        "Trans Time\n交易时间": TimeField,
         "Trading Type\n交易类型": StrField,
         "Dc Flg\n借贷": StrField,
         "Trans Amt\n交易金额": DecimalField,
@@ -58,7 +62,7 @@ Record = TypedDict(
 )
 
 
-class Parser(BaseParser):
+class Parser(RecordParser[Record]):
     """Parser for Bank of Communications transaction records.
 
     Implements the Parser protocol to convert Bank of Communications transaction records
@@ -66,11 +70,14 @@ class Parser(BaseParser):
     logic for determining transaction amounts and directions.
     """
 
-    __validator = TypeAdapter(Record)
     __account_pattern = re.compile(r"账号/卡号Account/Card No:\s*(\d{19})\s*")
     __date_pattern = re.compile(r"查询止日Query Ending Date:\s*(\d{4}-\d{2}-\d{2})\s*")
     __currency_pattern = re.compile(r"币种Currency:\s*(\w+)\s*")
 
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__(Record)
+
     @property
     @override
     def reversed(self) -> bool:
@@ -88,8 +95,7 @@ class Parser(BaseParser):
         )
 
     @override
-    def parse(self, record: dict[str, str]) -> Transaction:
-        validated = self.__validator.validate_python(record)
+    def _parse_validated(self, validated: Record) -> Transaction:
         return Transaction(
             date=validated["Trans Date\n交易日期"],
             extra=Extra(
@@ -98,6 +104,7 @@ class Parser(BaseParser):
                 type=validated["Trading Type\n交易类型"],
                 payee_account=validated["Payment Receipt\nAccount\n对方账号"],
                 place=validated["Trading Place\n交易地点"],
+                transaction_id=self._parse_transaction_id(validated),
             ),
             payee=validated["Payment Receipt\nAccount Name\n对方户名"],
             narration=validated["Abstract\n摘要"],
@@ -111,6 +118,15 @@ class Parser(BaseParser):
             ),
         )
 
+    def _parse_transaction_id(self, validated: Record) -> str:
+        # statements carry no serial numbers, while the running balance tells
+        # apart transactions at the same time
+        date = validated["Trans Date\n交易日期"]
+        time = validated["Trans Time\n交易时间"]
+        amount = validated["Trans Amt\n交易金额"]
+        balance = validated["Balance\n余额"]
+        return f"{date:%Y%m%d}{time:%H%M%S}/{amount}/{balance}"
+
     def _parse_amount(self, validated: Record) -> Decimal:
         dc_key = "Dc Flg\n借贷"
         match validated[dc_key]:
@@ -129,15 +145,28 @@ class Importer(BaseImporter):
     the Bank of Communications parser implementation.
     """
 
-    def __init__(self, **kwargs: Unpack[ImporterKwargs]) -> None:
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        learn_template: bool = False,
+        **kwargs: Unpack[ImporterKwargs],
+    ) -> None:
         """Initialize the Bank of Communications importer.
 
         Args:
+            workers: Number of processes extracting PDF pages in parallel.
+            learn_template: Whether to learn the column layout of the table from
+                the first page and skip table detection on the others.
             **kwargs: Additional configuration parameters.
         """
         super().__init__(
             re.compile(r"交通银行交易流水\(申请时间[^)]*\).pdf"),
-            pdf_table.Reader(table_bbox=(0, 148, 842, 491)),
+            pdf_table.Reader(
+                table_bbox=(0, 148, 842, 491),
+                workers=workers,
+                learn_template=learn_template,
+            ),
             Parser(),
             **kwargs,
         )
@@ -5,32 +5,35 @@ JD.com transactions into Beancount entries.
 """
 
 import re
-from collections.abc import Iterator
-from datetime import date, datetime
+from collections.abc import Iterable, Iterator
+from datetime import date
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, NamedTuple
 
-from pydantic import AfterValidator, BeforeValidator, TypeAdapter
-from typing_extensions import TypedDict, Unpack, override
+from pydantic import AfterValidator, PlainValidator
+from typing_extensions import NotRequired, TypedDict, Unpack, override
 
 from beancount_daoru.importer import (
+    DatetimeField,
     Extra,
     ImporterKwargs,
     Metadata,
-    ParserError,
     Posting,
+    RecordParser,
     Transaction,
+    memoize_decoder,
 )
 from beancount_daoru.importer import Importer as BaseImporter
-from beancount_daoru.importer import Parser as BaseParser
 from beancount_daoru.readers import excel
+from beancount_daoru.rules import Rule, RuleTable
 from beancount_daoru.utils import search_patterns
 
 _STATUS_PATTERN = re.compile(r"\(.*\)")
 
 
-def _validate_amount(v: str) -> str:
-    return _STATUS_PATTERN.sub("", v)
+@memoize_decoder
+def _decode_amount(v: str) -> Decimal:
+    return Decimal(_STATUS_PATTERN.sub("", v))
 
 
 def _empty_to_none(v: object | None) -> object:
@@ -39,14 +42,14 @@ def _empty_to_none(v: object | None) -> object:
     return v
 
 
-DecimalField = Annotated[Decimal, BeforeValidator(_validate_amount)]
+DecimalField = Annotated[Decimal, PlainValidator(_decode_amount)]
 StrField = Annotated[str | None, AfterValidator(_empty_to_none)]
 
 
 Record = TypedDict(
     "Record",
     {
-        "交易时间": datetime,
+        "交易时间": DatetimeField,
         "商户名称": StrField,
         "交易说明": StrField,
         "金额": DecimalField,
@@ -54,12 +57,33 @@ Record = TypedDict(
         "交易状态": StrField,
         "收/支": StrField,
         "交易分类": StrField,
+        "交易订单号": NotRequired[StrField],
+        "商家订单号": NotRequired[StrField],
         "备注": StrField,
     },
 )
 
 
-class Parser(BaseParser):
+class Flow(NamedTuple):
+    """Action of a rule describing how the amount of a record flows.
+
+    Attributes:
+        outflow: Whether the amount leaves the payment method.
+    """
+
+    outflow: bool
+
+
+_RULES = RuleTable[Flow](
+    ("收/支", "交易状态"),
+    [
+        (({"支出", "不计收支"}, "交易成功"), Flow(outflow=True)),
+        (("不计收支", "退款成功"), Flow(outflow=False)),
+    ],
+)
+
+
+class Parser(RecordParser[Record]):
     """Parser for JD transaction records.
 
     Implements the Parser protocol to convert JD transaction records
@@ -67,10 +91,19 @@ class Parser(BaseParser):
     logic for determining transaction amounts and directions.
     """
 
-    __validator = TypeAdapter(Record)
     __account_pattern = re.compile(r"京东账号名：(\S+)")  # noqa: RUF001
     __date_pattern = re.compile(r"日期区间：\d{4}-\d{2}-\d{2} 至 (\d{4}-\d{2}-\d{2})")  # noqa: RUF001
 
+    def __init__(self, rules: Iterable[Rule[Flow]] = ()) -> None:
+        """Initialize the parser.
+
+        Args:
+            rules: Additional rules on (收/支, 交易状态), taking precedence over
+                the built-in ones.
+        """
+        super().__init__(Record)
+        self.__rules = _RULES.extended(rules)
+
     @property
     @override
     def reversed(self) -> bool:
@@ -87,8 +120,7 @@ class Parser(BaseParser):
         )
 
     @override
-    def parse(self, record: dict[str, str]) -> Transaction:
-        validated = self.__validator.validate_python(record)
+    def _parse_validated(self, validated: Record) -> Transaction:
         return Transaction(
             date=validated["交易时间"].date(),
             extra=Extra(
@@ -97,6 +129,8 @@ class Parser(BaseParser):
                 status=validated["交易状态"],
                 type=validated["交易分类"],
                 remarks=validated["备注"],
+                transaction_id=validated.get("交易订单号"),
+                merchant_order_id=validated.get("商家订单号"),
             ),
             payee=validated["商户名称"],
             narration=validated["交易说明"],
@@ -109,15 +143,8 @@ class Parser(BaseParser):
         )
 
     def _parse_amount(self, validated: Record) -> Decimal:
-        dc_key = "收/支"
-        status_key = "交易状态"
-        match (validated[dc_key], validated[status_key]):
-            case ("支出" | "不计收支", "交易成功"):
-                return -validated["金额"]
-            case ("不计收支", "退款成功"):
-                return validated["金额"]
-            case _:
-                raise ParserError(dc_key, status_key)
+        flow, _ = self.__rules.lookup(validated)
+        return -validated["金额"] if flow.outflow else validated["金额"]
 
 
 class Importer(BaseImporter):
@@ -127,15 +154,21 @@ class Importer(BaseImporter):
     the JD.com extractor and builder implementations.
     """
 
-    def __init__(self, **kwargs: Unpack[ImporterKwargs]) -> None:
+    def __init__(
+        self,
+        *,
+        rules: Iterable[Rule[Flow]] = (),
+        **kwargs: Unpack[ImporterKwargs],
+    ) -> None:
         """Initialize the JD.com importer.
 
         Args:
+            rules: Additional rules for classifying transactions, see `Parser`.
             **kwargs: Additional configuration parameters.
         """
         super().__init__(
             re.compile(r"京东交易流水\(申请时间[^)]*\)_\d+\.csv"),
             excel.Reader(header=21, encoding="utf-8-sig"),
-            Parser(),
+            Parser(rules),
             **kwargs,
         )
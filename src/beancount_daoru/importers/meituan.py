@@ -5,25 +5,27 @@ Meituan transactions into Beancount entries.
 """
 
 import re
-from collections.abc import Iterator
-from datetime import date, datetime
+from collections.abc import Iterable, Iterator
+from datetime import date
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, NamedTuple
 
-from pydantic import AfterValidator, BeforeValidator, TypeAdapter
-from typing_extensions import TypedDict, Unpack, override
+from pydantic import AfterValidator, PlainValidator
+from typing_extensions import NotRequired, TypedDict, Unpack, override
 
 from beancount_daoru.importer import (
+    DatetimeField,
     Extra,
     ImporterKwargs,
     Metadata,
-    ParserError,
     Posting,
+    RecordParser,
     Transaction,
+    memoize_decoder,
 )
 from beancount_daoru.importer import Importer as BaseImporter
-from beancount_daoru.importer import Parser as BaseParser
 from beancount_daoru.readers import excel
+from beancount_daoru.rules import ANY, Affix, Rule, RuleTable
 from beancount_daoru.utils import search_patterns
 
 
@@ -35,29 +37,59 @@ def _validate_str(v: str | None) -> str | None:
     return v
 
 
-def _split_amount(v: str) -> tuple[str, str]:
-    return v[0], v[1:]
+@memoize_decoder
+def _decode_amount(v: str) -> tuple[str, Decimal]:
+    return v[0], Decimal(v[1:])
 
 
-AmountField = Annotated[tuple[str, Decimal], BeforeValidator(_split_amount)]
+AmountField = Annotated[tuple[str, Decimal], PlainValidator(_decode_amount)]
 StrField = Annotated[str | None, AfterValidator(_validate_str)]
 
 
 Record = TypedDict(
     "Record",
     {
-        "交易成功时间": datetime,
+        "交易成功时间": DatetimeField,
         "交易类型": StrField,
         "订单标题": StrField,
         "收/支": StrField,
         "实付金额": AmountField,
         "支付方式": str,
+        "交易单号": NotRequired[StrField],
+        "商家单号": NotRequired[StrField],
         "备注": StrField,
     },
 )
 
 
-class Parser(BaseParser):
+class Flow(NamedTuple):
+    """Action of a rule describing how the amount of a record flows.
+
+    Attributes:
+        outflow: Whether the amount leaves the payment method.
+    """
+
+    outflow: bool
+
+
+_FLOW_RULES = RuleTable[Flow](
+    ("收/支",),
+    [
+        (("支出",), Flow(outflow=True)),
+        (("收入",), Flow(outflow=False)),
+    ],
+)
+
+_RULES = RuleTable[str | None](
+    ("交易类型", "订单标题"),
+    [
+        (("还款", Affix("【美团月付】主动还款")), "美团月付"),
+        (({"支付", "退款"}, ANY), None),
+    ],
+)
+
+
+class Parser(RecordParser[Record]):
     """Parser for Meituan transaction records.
 
     Implements the Parser protocol to convert Meituan transaction records
@@ -65,10 +97,27 @@ class Parser(BaseParser):
     logic for determining transaction amounts and directions.
     """
 
-    __validator = TypeAdapter(Record)
     __account_pattern = re.compile(r"美团用户名：\[([^\]]*)\]")  # noqa: RUF001
     __date_pattern = re.compile(r"终止时间：\[(\d{4}-\d{2}-\d{2})\]")  # noqa: RUF001
 
+    def __init__(
+        self,
+        rules: Iterable[Rule[str | None]] = (),
+        flow_rules: Iterable[Rule[Flow]] = (),
+    ) -> None:
+        """Initialize the parser.
+
+        Args:
+            rules: Additional rules on (交易类型, 订单标题) resolving the counter
+                party of a transaction, taking precedence over the built-in
+                ones. An action of None adds no counter party posting.
+            flow_rules: Additional rules on (收/支,) resolving the direction of
+                the amount, taking precedence over the built-in ones.
+        """
+        super().__init__(Record)
+        self.__rules = _RULES.extended(rules)
+        self.__flow_rules = _FLOW_RULES.extended(flow_rules)
+
     @property
     @override
     def reversed(self) -> bool:
@@ -85,8 +134,7 @@ class Parser(BaseParser):
         )
 
     @override
-    def parse(self, record: dict[str, str]) -> Transaction:
-        validated = self.__validator.validate_python(record)
+    def _parse_validated(self, validated: Record) -> Transaction:
         return Transaction(
             date=validated["交易成功时间"].date(),
             extra=Extra(
@@ -94,6 +142,8 @@ class Parser(BaseParser):
                 dc=validated["收/支"],
                 type=validated["交易类型"],
                 remarks=validated["备注"],
+                transaction_id=validated.get("交易单号"),
+                merchant_order_id=validated.get("商家单号"),
             ),
             payee="美团",
             narration=validated["订单标题"],
@@ -119,27 +169,13 @@ class Parser(BaseParser):
             )
 
     def _parse_amount(self, validated: Record) -> Decimal:
-        dc_key = "收/支"
-
-        match validated[dc_key]:
-            case "支出":
-                return -validated["实付金额"][1]
-            case "收入":
-                return validated["实付金额"][1]
-            case _:
-                raise ParserError(dc_key)
+        flow, _ = self.__flow_rules.lookup(validated)
+        amount = validated["实付金额"][1]
+        return -amount if flow.outflow else amount
 
     def _parse_counter_party(self, validated: Record) -> str | None:
-        type_key = "交易类型"
-        narration_key = "订单标题"
-
-        match (validated[type_key], validated[narration_key]):
-            case ("还款", str(x)) if x.startswith("【美团月付】主动还款"):
-                return "美团月付"
-            case ("支付" | "退款", _):
-                return None
-            case _:
-                raise ParserError(type_key, narration_key)
+        counter_party, _ = self.__rules.lookup(validated)
+        return counter_party
 
 
 class Importer(BaseImporter):
@@ -149,15 +185,24 @@ class Importer(BaseImporter):
     the Meituan extractor and builder implementations.
     """
 
-    def __init__(self, **kwargs: Unpack[ImporterKwargs]) -> None:
+    def __init__(
+        self,
+        *,
+        rules: Iterable[Rule[str | None]] = (),
+        flow_rules: Iterable[Rule[Flow]] = (),
+        **kwargs: Unpack[ImporterKwargs],
+    ) -> None:
         """Initialize the Meituan importer.
 
         Args:
+            rules: Additional rules for classifying transactions, see `Parser`.
+            flow_rules: Additional rules for the direction of amounts, see
+                `Parser`.
             **kwargs: Additional configuration parameters.
         """
         super().__init__(
             re.compile(r"美团账单\(\d{8}-\d{8}\)\.csv"),
             excel.Reader(header=19, encoding="utf-8-sig"),
-            Parser(),
+            Parser(rules, flow_rules),
             **kwargs,
         )
@@ -5,25 +5,27 @@ WeChat Pay transactions into Beancount entries.
 """
 
 import re
-from collections.abc import Iterator
-from datetime import date, datetime
+from collections.abc import Iterable, Iterator
+from datetime import date
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, NamedTuple
 
-from pydantic import AfterValidator, BeforeValidator, TypeAdapter
-from typing_extensions import TypedDict, Unpack, override
+from pydantic import AfterValidator, PlainValidator
+from typing_extensions import NotRequired, TypedDict, Unpack, override
 
 from beancount_daoru.importer import (
+    DatetimeField,
     Extra,
     ImporterKwargs,
     Metadata,
-    ParserError,
     Posting,
+    RecordParser,
     Transaction,
+    memoize_decoder,
 )
 from beancount_daoru.importer import Importer as BaseImporter
-from beancount_daoru.importer import Parser as BaseParser
 from beancount_daoru.readers import excel
+from beancount_daoru.rules import ANY, Affix, Rule, RuleTable
 from beancount_daoru.utils import search_patterns
 
 
@@ -35,18 +37,19 @@ def _validate_str(v: str | None) -> str | None:
     return v
 
 
-def _split_amount(v: str) -> tuple[str, str]:
-    return v[0], v[1:]
+@memoize_decoder
+def _decode_amount(v: str) -> tuple[str, Decimal]:
+    return v[0], Decimal(v[1:])
 
 
-AmountField = Annotated[tuple[str, Decimal], BeforeValidator(_split_amount)]
+AmountField = Annotated[tuple[str, Decimal], PlainValidator(_decode_amount)]
 StrField = Annotated[str | None, AfterValidator(_validate_str)]
 
 
 Record = TypedDict(
     "Record",
     {
-        "交易时间": datetime,
+        "交易时间": DatetimeField,
         "交易类型": StrField,
         "交易对方": StrField,
         "商品": StrField,
@@ -54,12 +57,66 @@ Record = TypedDict(
         "金额(元)": AmountField,
         "支付方式": str,
         "当前状态": StrField,
+        "交易单号": NotRequired[StrField],
+        "商户单号": NotRequired[StrField],
         "备注": StrField,
     },
 )
 
 
-class Parser(BaseParser):
+class Flow(NamedTuple):
+    """Action of a rule describing how the amount of a record flows.
+
+    Account names are formatted with the parts captured by the affix patterns
+    of the rule, e.g. "{0}" is replaced by the first captured part.
+
+    Attributes:
+        outflow: Whether the amount leaves the account.
+        account: Account of the amount, the payment method of the record if None.
+        counter_party: Account receiving the amount, if tracked.
+        fee_account: Account of a fee whose currency and amount are the last
+            captured part, if any.
+    """
+
+    outflow: bool
+    account: str | None = None
+    counter_party: str | None = None
+    fee_account: str | None = None
+
+
+_RULES = RuleTable[Flow](
+    ("收/支", "交易类型", "当前状态", "备注"),
+    [
+        (
+            ("支出", {"商户消费", "分分捐", "亲属卡交易"}, {"支付成功", "已退款"}, ANY),
+            Flow(outflow=True),
+        ),
+        (("支出", {"赞赏码", "转账"}, "朋友已收钱", ANY), Flow(outflow=True)),
+        (("支出", "扫二维码付款", "已转账", ANY), Flow(outflow=True)),
+        (("收入", "其他", "已到账", ANY), Flow(outflow=False)),
+        (("收入", "商户消费", "充值成功", ANY), Flow(outflow=False)),
+        (("收入", "二维码收款", "已收钱", ANY), Flow(outflow=False)),
+        (("收入", "微信红包", "已存入零钱", ANY), Flow(outflow=False)),
+        ((None, {"购买理财通", "信用卡还款"}, "支付成功", ANY), Flow(outflow=False)),
+        (("收入", "退款", "已退款", ANY), Flow(outflow=False)),
+        (
+            (None, Affix("转入零钱通-来自"), "支付成功", ANY),
+            Flow(outflow=True, counter_party="零钱通"),
+        ),
+        (
+            (None, Affix("零钱通转出-到"), "支付成功", ANY),
+            Flow(outflow=True, account="零钱通", counter_party="{0}"),
+        ),
+        ((None, "零钱充值", "充值完成", ANY), Flow(outflow=True, counter_party="零钱")),
+        (
+            (None, "零钱提现", "提现已到账", Affix("服务费")),
+            Flow(outflow=True, counter_party="零钱", fee_account="零钱提现服务费"),
+        ),
+    ],
+)
+
+
+class Parser(RecordParser[Record]):
     """Parser for WeChat Pay transaction records.
 
     Implements the Parser protocol to convert WeChat Pay transaction records
@@ -67,10 +124,20 @@ class Parser(BaseParser):
     logic for determining transaction amounts and directions.
     """
 
-    __validator = TypeAdapter(Record)
     __account_pattern = re.compile(r"微信昵称：\[([^\]]*)\]")  # noqa: RUF001
     __date_pattern = re.compile(r"终止时间：\[(\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2}]")  # noqa: RUF001
 
+    def __init__(self, rules: Iterable[Rule[Flow]] = ()) -> None:
+        """Initialize the parser.
+
+        Args:
+            rules: Additional rules on (收/支, 交易类型, 当前状态, 备注), taking
+                precedence over the built-in ones. Refund statuses and types are
+                normalized to "已退款" and "退款" before matching.
+        """
+        super().__init__(Record)
+        self.__rules = _RULES.extended(rules)
+
     @property
     @override
     def reversed(self) -> bool:
@@ -87,8 +154,7 @@ class Parser(BaseParser):
         )
 
     @override
-    def parse(self, record: dict[str, str]) -> Transaction:
-        validated = self.__validator.validate_python(record)
+    def _parse_validated(self, validated: Record) -> Transaction:
         return Transaction(
             date=validated["交易时间"].date(),
             extra=Extra(
@@ -97,6 +163,8 @@ class Parser(BaseParser):
                 status=validated["当前状态"],
                 type=validated["交易类型"],
                 remarks=validated["备注"],
+                transaction_id=validated.get("交易单号"),
+                merchant_order_id=validated.get("商户单号"),
             ),
             payee=validated["交易对方"],
             narration=validated["商品"],
@@ -128,63 +196,40 @@ class Parser(BaseParser):
     def _parse_simple_postings(
         self, validated: Record
     ) -> tuple[str, Decimal, str | None, Posting | None]:
-        dc_key = "收/支"
-        type_key = "交易类型"
-        status_key = "当前状态"
-        remarks_key = "备注"
-
-        method = validated["支付方式"]
-        amount = validated["金额(元)"][1]
-
-        status = validated[status_key]
+        status = validated["当前状态"]
         if status is not None and status.startswith("已退款"):
             status = "已退款"
 
-        txn_type = validated[type_key]
+        txn_type = validated["交易类型"]
         if txn_type is not None and txn_type.endswith("-退款"):
             txn_type = "退款"
 
-        match (
-            validated[dc_key],
-            txn_type,
-            status,
-            validated[remarks_key],
-        ):
-            case (
-                ("支出", "商户消费" | "分分捐" | "亲属卡交易", "支付成功" | "已退款", _)
-                | ("支出", "赞赏码" | "转账", "朋友已收钱", _)
-                | ("支出", "扫二维码付款", "已转账", _)
-            ):
-                return method, -amount, None, None
-            case (
-                ("收入", "其他", "已到账", _)
-                | ("收入", "商户消费", "充值成功", _)
-                | ("收入", "二维码收款", "已收钱", _)
-                | ("收入", "微信红包", "已存入零钱", _)
-                | (None, "购买理财通" | "信用卡还款", "支付成功", _)
-                | ("收入", "退款", "已退款", _)
-            ):
-                return method, amount, None, None
-            case (None, str(x), "支付成功", _) if x.startswith("转入零钱通-来自"):
-                return method, -amount, "零钱通", None
-            case (None, str(x), "支付成功", _) if x.startswith("零钱通转出-到"):
-                return "零钱通", -amount, x[len("零钱通转出-到") :], None
-            case (None, "零钱充值", "充值完成", _):
-                return method, -amount, "零钱", None
-            case (None, "零钱提现", "提现已到账", str(x)) if x.startswith("服务费"):
-                currency_and_amount = x[len("服务费") :]
-                return (
-                    method,
-                    -amount,
-                    "零钱",
-                    Posting(
-                        amount=Decimal(currency_and_amount[1:]),
-                        account="零钱提现服务费",
-                        currency=currency_and_amount[0],
-                    ),
-                )
-            case _:
-                raise ParserError(dc_key, type_key, status_key, remarks_key)
+        flow, captures = self.__rules.lookup(
+            {
+                "收/支": validated["收/支"],
+                "交易类型": txn_type,
+                "当前状态": status,
+                "备注": validated["备注"],
+            }
+        )
+        amount = validated["金额(元)"][1]
+        account = (
+            validated["支付方式"]
+            if flow.account is None
+            else flow.account.format(*captures)
+        )
+        counter_party = (
+            None if flow.counter_party is None else flow.counter_party.format(*captures)
+        )
+        fee = None
+        if flow.fee_account is not None:
+            currency_and_amount = captures[-1]
+            fee = Posting(
+                amount=Decimal(currency_and_amount[1:]),
+                account=flow.fee_account,
+                currency=currency_and_amount[0],
+            )
+        return account, -amount if flow.outflow else amount, counter_party, fee
 
 
 class Importer(BaseImporter):
@@ -194,15 +239,21 @@ class Importer(BaseImporter):
     the WeChat Pay parser implementation.
     """
 
-    def __init__(self, **kwargs: Unpack[ImporterKwargs]) -> None:
+    def __init__(
+        self,
+        *,
+        rules: Iterable[Rule[Flow]] = (),
+        **kwargs: Unpack[ImporterKwargs],
+    ) -> None:
         """Initialize the WeChat Pay importer.
 
         Args:
+            rules: Additional rules for classifying transactions, see `Parser`.
             **kwargs: Additional configuration parameters.
         """
         super().__init__(
             re.compile(r"微信支付账单流水文件\(\d{8}-\d{8}\).*\.xlsx"),
             excel.Reader(header=16),
-            Parser(),
+            Parser(rules),
             **kwargs,
         )
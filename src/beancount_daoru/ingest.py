@@ -0,0 +1,339 @@
+"""Parallel and streaming extraction of entries from multiple documents.
+
+This module provides an extraction engine that processes documents in a pool
+of worker processes, an ingest wrapper using it for the extract command, and
+a writer streaming extracted entries to a file.
+"""
+
+import textwrap
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple, TextIO
+
+import beangulp
+import click
+from beancount import Account, Directive, Directives, loader
+from beancount.parser import printer
+from beangulp import Importer, exceptions, identify, utils
+from beangulp import extract as beangulp_extract
+
+from beancount_daoru.hook import Hook, Imported
+from beancount_daoru.importer import Importer as BaseImporter
+
+# number of entries handed to hooks and written at once when streaming
+_CHUNK_SIZE = 1024
+
+
+class _Extracted(NamedTuple):
+    matches: tuple[int, ...]
+    entries: Directives
+    account: Account
+
+
+# importers and existing entries of the current worker process
+_context: tuple[Sequence[Importer], Directives] = ((), [])
+
+
+def extract(
+    importers: Sequence[Importer],
+    filenames: Iterable[str],
+    existing: Sequence[Directive] = (),
+    *,
+    hooks: Iterable[Hook] = (),
+    workers: int | None = None,
+) -> list[Imported]:
+    """Extract entries from documents in parallel.
+
+    Each document is identified, extracted, sorted and deduplicated against the
+    existing entries in a worker process. Results are gathered in a
+    deterministic order and deduplicated across documents, then the hooks are
+    invoked, the same way as the extract command of beangulp.
+
+    Args:
+        importers: Importers to identify and extract documents with.
+        filenames: Paths of the documents.
+        existing: Existing entries for deduplication.
+        hooks: Hooks invoked on the extracted entries.
+        workers: Number of worker processes, defaults to the number of CPUs.
+            Documents are processed in the current process if it is 1.
+
+    Returns:
+        The extracted entries grouped by document.
+    """
+    imported: list[Imported] = []
+    with _extract_files(importers, filenames, existing, workers) as results:
+        for filename, future in results:
+            item = _imported(importers, filename, future.result())
+            if item is not None:
+                imported.append(item)
+    return _finalize(imported, existing, hooks)
+
+
+def write(
+    importers: Sequence[Importer],
+    filenames: Iterable[str],
+    output: TextIO,
+    existing: Sequence[Directive] = (),
+    *,
+    hooks: Iterable[Hook] = (),
+) -> None:
+    """Extract entries from documents and write them while they are produced.
+
+    Entries are streamed from the importers of this package (see
+    `beancount_daoru.importer.Importer.stream`), passed through the hooks and
+    written in chunks, so memory stays bounded regardless of the length of
+    the documents. Unlike `extract`, documents are written in the given order
+    and not deduplicated against each other, and hooks receive one chunk of
+    entries of a document at a time.
+
+    Args:
+        importers: Importers to identify and extract documents with.
+        filenames: Paths of the documents.
+        output: File the entries are written to.
+        existing: Existing entries for deduplication.
+        hooks: Hooks invoked on each chunk of extracted entries.
+    """
+    existing = list(existing)
+    hooks = list(hooks)
+    header = False
+    for filename in filenames:
+        importer = identify.identify(importers, filename)
+        if importer is None:
+            continue
+        account: Account = importer.account(filename)
+        entries = _stream(importer, filename, existing)
+        chunk: Directives = list(islice(entries, _CHUNK_SIZE))
+        section = True
+        while True:
+            imported: list[Imported] = [(filename, chunk, account, importer)]
+            for hook in hooks:
+                imported = hook(imported, existing)
+            for name, directives, _, _ in imported:
+                if not header:
+                    _ = output.write(beangulp_extract.HEADER + "\n")
+                    header = True
+                if section:
+                    _ = output.write(beangulp_extract.SECTION.format(name) + "\n\n")
+                    section = False
+                _write_entries(output, directives)
+            output.flush()
+            if not (chunk := list(islice(entries, _CHUNK_SIZE))):
+                break
+        _ = output.write("\n")
+
+
+class Ingest(beangulp.Ingest):
+    """Ingest wrapper extracting documents in parallel.
+
+    It is a drop-in replacement of `beangulp.Ingest`, whose extract command
+    accepts the number of worker processes as the `--workers` option.
+    """
+
+    def __init__(
+        self, importers: Sequence[Importer], hooks: Iterable[Hook] | None = None
+    ) -> None:
+        """Initialize the ingest wrapper.
+
+        Args:
+            importers: Importers to identify and extract documents with.
+            hooks: Hooks invoked on the extracted entries.
+        """
+        super().__init__(importers, hooks)
+        self.cli.add_command(_extract_command)
+
+
+@click.command("extract")
+@click.argument("src", nargs=-1, type=click.Path(exists=True, resolve_path=True))
+@click.option("--output", "-o", type=click.File("w"), default="-", help="Output file.")
+@click.option(
+    "--existing",
+    "-e",
+    type=click.Path(exists=True),
+    help="Existing Beancount ledger for de-duplication.",
+)
+@click.option("--reverse", "-r", is_flag=True, help="Sort entries in reverse order.")
+@click.option(
+    "--failfast", "-x", is_flag=True, help="Stop processing at the first error."
+)
+@click.option("--quiet", "-q", count=True, help="Suppress all output.")
+@click.option(
+    "--workers",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of worker processes, defaults to the number of CPUs.",
+)
+@click.pass_obj
+def _extract_command(  # noqa: PLR0913, PLR0917
+    ctx: Ingest,
+    src: tuple[str, ...],
+    output: TextIO,
+    existing: str | None,
+    reverse: bool,  # noqa: FBT001
+    failfast: bool,  # noqa: FBT001
+    quiet: int,
+    workers: int | None,
+) -> None:
+    """Extract transactions from documents.
+
+    Walk the SRC list of files or directories and extract the ledger
+    entries from each file identified by one of the configured
+    importers.  The entries are written to the specified output file
+    or to the standard output in Beancount ledger format in sections
+    associated to the source document.
+    """
+    del reverse  # accepted for compatibility, entries are not reversed either
+    log: Callable[..., None] = utils.logger(-quiet, err=True)
+    errors = exceptions.ExceptionsTrap(log)
+    importers: list[Importer] = ctx.importers
+    hooks: list[Hook] = ctx.hooks  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+    existing_entries: Directives = loader.load_file(existing)[0] if existing else []
+
+    imported: list[Imported] = []
+    with _extract_files(
+        importers, _walk(src, log), existing_entries, workers
+    ) as results:
+        for filename, future in results:
+            log(f"* {filename}", nl=False)
+            with errors:
+                item = _imported(importers, filename, future.result())
+                if item is None:
+                    log("")
+                    continue
+                imported.append(item)
+                log(" ... OK", fg="green")
+            if failfast and errors:
+                break
+
+    imported = _finalize(imported, existing_entries, hooks)
+    beangulp_extract.print_extracted_entries(imported, output)
+    if errors:
+        raise SystemExit(1)
+
+
+def _walk(paths: Sequence[str], log: Callable[..., None]) -> Iterator[str]:
+    for filename in utils.walk(paths):
+        if Path(filename).stat().st_size > identify.FILE_TOO_LARGE_THRESHOLD:
+            log(f"* {filename} ... SKIP")
+            continue
+        yield filename
+
+
+@contextmanager
+def _extract_files(
+    importers: Sequence[Importer],
+    filenames: Iterable[str],
+    existing: Sequence[Directive],
+    workers: int | None,
+) -> Generator[Iterator[tuple[str, Future[_Extracted]]]]:
+    context = (importers, list(existing))
+    if workers == 1:
+        yield ((filename, _run(context, filename)) for filename in filenames)
+        return
+    with ProcessPoolExecutor(
+        workers, initializer=_initialize, initargs=context
+    ) as executor:
+        futures = [
+            (filename, executor.submit(_extract_file, filename))
+            for filename in filenames
+        ]
+        try:
+            yield iter(futures)
+        finally:
+            for _, future in futures:
+                _ = future.cancel()
+
+
+def _run(
+    context: tuple[Sequence[Importer], Directives], filename: str
+) -> Future[_Extracted]:
+    global _context  # noqa: PLW0603
+    _context = context
+    future: Future[_Extracted] = Future()
+    try:
+        future.set_result(_extract_file(filename))
+    except Exception as error:  # noqa: BLE001
+        future.set_exception(error)
+    return future
+
+
+def _initialize(importers: Sequence[Importer], existing: Directives) -> None:
+    global _context  # noqa: PLW0603
+    _context = (importers, existing)
+
+
+def _extract_file(filename: str) -> _Extracted:
+    importers, existing = _context
+    matches = tuple(
+        index for index, importer in enumerate(importers) if importer.identify(filename)
+    )
+    if len(matches) != 1:
+        return _Extracted(matches, [], "")
+    importer = importers[matches[0]]
+    entries: Directives = beangulp_extract.extract_from_file(  # pyright: ignore[reportUnknownVariableType]
+        importer, filename, existing
+    )
+    importer.deduplicate(entries, existing)
+    return _Extracted(matches, entries, importer.account(filename))
+
+
+def _imported(
+    importers: Sequence[Importer], filename: str, extracted: _Extracted
+) -> Imported | None:
+    if len(extracted.matches) > 1:
+        msg = "Document identified by more than one importer."
+        raise exceptions.Error(
+            msg, *(f"  {importers[index].name}" for index in extracted.matches)
+        )
+    if not extracted.matches:
+        return None
+    importer = importers[extracted.matches[0]]
+    return filename, extracted.entries, extracted.account, importer
+
+
+def _stream(
+    importer: Importer, filename: str, existing: Directives
+) -> Iterator[Directive]:
+    if isinstance(importer, BaseImporter):
+        return importer.stream(filename, existing)
+    entries: Directives = beangulp_extract.extract_from_file(  # pyright: ignore[reportUnknownVariableType]
+        importer, filename, existing
+    )
+    importer.deduplicate(entries, existing)
+    return iter(entries)
+
+
+def _write_entries(output: TextIO, entries: Iterable[Directive]) -> None:
+    # the same format as beangulp.extract.print_extracted_entries
+    for entry in entries:
+        duplicate = entry.meta.pop(beangulp_extract.DUPLICATE, None)  # pyright: ignore[reportAny]
+        string = printer.format_entry(entry)
+        if duplicate is not None:
+            if isinstance(duplicate, type(entry)):
+                filename = duplicate.meta.get("filename")
+                lineno = duplicate.meta.get("lineno")
+                if filename and lineno:
+                    _ = output.write(f"; duplicate of {filename}:{lineno}\n")
+            string = textwrap.indent(string, "; ")
+        _ = output.write(string)
+        _ = output.write("\n")
+
+
+def _finalize(
+    imported: list[Imported],
+    existing: Sequence[Directive],
+    hooks: Iterable[Hook],
+) -> list[Imported]:
+    beangulp_extract.sort_extracted_entries(imported)
+    # entries were deduplicated against the existing ones by workers, while
+    # duplicates across documents depend on the order of the documents
+    extracted: Directives = []
+    for _, entries, _, importer in imported:
+        importer.deduplicate(entries, extracted)
+        extracted.extend(entries)
+    existing_entries = [*existing, *extracted]
+    for hook in hooks:
+        imported = hook(imported, existing_entries)
+    return imported
@@ -0,0 +1,164 @@
+"""Journal of imported files and records.
+
+This module provides an on-disk journal remembering which files and records
+were already imported, so later imports only yield what is new.
+"""
+
+from collections import Counter
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from diskcache import Cache
+
+# bump when the computation of fingerprints changes
+_FORMAT_VERSION = 2
+
+
+class Journal:
+    """Journal of imported files and records, persisted on disk.
+
+    Files are identified by the hash of their content, records by a fingerprint
+    of their fields, their namespace (e.g. the source account) and the number
+    of identical records before them in the same file. Records of overlapping
+    exports thus have the same fingerprints, while repeated identical records
+    in one export stay distinct. Records with a stable transaction ID are also
+    indexed by it and the fields of the transaction which may change between
+    exports (e.g. its status), so they are recognized even if other fields
+    changed, while a changed transaction is imported again as a revision.
+
+    The journal is never evicted, and can be shared by multiple importers and
+    processes.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the journal.
+
+        Args:
+            directory: Directory of the journal. Requires the `cache` extra.
+        """
+        import diskcache  # noqa: PLC0415
+
+        self.__store: Cache = diskcache.Cache(directory, eviction_policy="none")
+
+    def is_imported(self, digest: str) -> bool:
+        """Check whether a file was completely imported.
+
+        Args:
+            digest: Content hash of the file, see `beancount_daoru.utils.file_digest`.
+
+        Returns:
+            True if all records of the file were imported.
+        """
+        return _file_key(digest) in self.__store
+
+    @contextmanager
+    def importing(self, digest: str, namespace: str) -> Generator["JournalEntry"]:
+        """Track the import of a file.
+
+        Records added to the entry are written to the journal when the context
+        exits without error, together with the file if no record failed.
+
+        Args:
+            digest: Content hash of the file.
+            namespace: Namespace of the records of the file.
+
+        Yields:
+            The entry tracking the records of the file.
+        """
+        entry = JournalEntry(self.__store, namespace)
+        yield entry
+        with self.__store.transact():
+            for fingerprint in entry.fingerprints:
+                _ = self.__store.set(fingerprint, value=True)
+            if entry.complete:
+                _ = self.__store.set(_file_key(digest), value=True)
+
+
+class JournalEntry:
+    """Records of a file being imported."""
+
+    def __init__(self, store: "Cache", namespace: str) -> None:
+        """Initialize the entry.
+
+        Args:
+            store: Store of the journal.
+            namespace: Namespace of the records.
+        """
+        self.__store = store
+        self.__namespace = namespace
+        self.__occurrences: Counter[str] = Counter()
+        # transaction markers of the keys returned by `identify`
+        self.__transactions: dict[str, str] = {}
+        self.fingerprints: list[str] = []
+        self.complete: bool = True
+
+    def fingerprint(self, record: Mapping[str, str]) -> str | None:
+        """Compute the fingerprint of the next record of the file.
+
+        Args:
+            record: The record.
+
+        Returns:
+            The fingerprint of the record, or None if it was imported before.
+        """
+        return self.__key("record", list(record.items()))
+
+    def identify(self, transaction_id: str, state: object) -> str | None:
+        """Compute the key of the next record of the file with a transaction ID.
+
+        Args:
+            transaction_id: Stable ID of the transaction at its source.
+            state: Fields of the transaction which may change between exports.
+
+        Returns:
+            The key of the transaction ID and state, or None if the transaction
+            was imported before in the same state.
+        """
+        key = self.__key("id", (transaction_id, state))
+        if key is not None:
+            self.__transactions[key] = self.__transaction_key(transaction_id)
+        return key
+
+    def is_revision(self, transaction_id: str) -> bool:
+        """Check whether a transaction was imported before in another state.
+
+        Args:
+            transaction_id: Stable ID of the transaction at its source.
+
+        Returns:
+            True if the transaction was imported before.
+        """
+        return self.__transaction_key(transaction_id) in self.__store
+
+    def add(self, fingerprint: str) -> None:
+        """Mark a record as imported.
+
+        Args:
+            fingerprint: Fingerprint or transaction ID key of the record.
+        """
+        self.fingerprints.append(fingerprint)
+        if (transaction := self.__transactions.get(fingerprint)) is not None:
+            self.fingerprints.append(transaction)
+
+    def __transaction_key(self, transaction_id: str) -> str:
+        hasher = blake2b(digest_size=16)
+        hasher.update(repr((self.__namespace, transaction_id)).encode())
+        return f"transaction:{_FORMAT_VERSION}:{hasher.hexdigest()}"
+
+    def __key(self, kind: str, value: object) -> str | None:
+        hasher = blake2b(digest_size=16)
+        hasher.update(repr((self.__namespace, value)).encode())
+        digest = f"{kind}:{_FORMAT_VERSION}:{hasher.hexdigest()}"
+        self.__occurrences[digest] += 1
+        key = f"{digest}:{self.__occurrences[digest]}"
+        if key in self.__store:
+            return None
+        return key
+
+
+def _file_key(digest: str) -> str:
+    return f"file:{_FORMAT_VERSION}:{digest}"
@@ -5,9 +5,26 @@ for reading various document formats (PDF, Excel, etc.) and converting them
 into structured data that can be processed by extractors.
 """
 
-from collections.abc import Iterator
+from collections.abc import Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from pathlib import Path
-from typing import Protocol
+from typing import NamedTuple, Protocol
+
+
+class Document(NamedTuple):
+    """Captions and records read from a single parse of a file.
+
+    Both iterators are lazy and share the underlying parsed file, so consuming
+    the captions first and the records afterwards does not parse the file twice.
+    They are only valid while the context returned by `Reader.read` is open.
+
+    Attributes:
+        captions: Iterator over caption/header text of the file.
+        records: Iterator over records of the file as dictionaries.
+    """
+
+    captions: Iterator[str]
+    records: Iterator[dict[str, str]]
 
 
 class Reader(Protocol):
@@ -17,6 +34,20 @@ class Reader(Protocol):
     into structured dictionaries that can be validated and converted to typed records.
     """
 
+    def read(self, file: Path) -> AbstractContextManager[Document]:
+        """Read captions and records from the file in a single parse.
+
+        The default implementation falls back to `read_captions` and
+        `read_records`, readers should override it to share the parsed file.
+
+        Args:
+            file: Path to the file to read.
+
+        Returns:
+            Context manager providing the document of the file.
+        """
+        return _read_separately(self, file)
+
     def read_captions(
         self,
         file: Path,
@@ -41,3 +72,11 @@ class Reader(Protocol):
             Dictionaries representing individual records.
         """
         ...
+
+
+@contextmanager
+def _read_separately(reader: Reader, file: Path) -> Generator[Document]:
+    yield Document(
+        captions=reader.read_captions(file),
+        records=reader.read_records(file),
+    )
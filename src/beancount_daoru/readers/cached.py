@@ -0,0 +1,118 @@
+"""Cached document reader implementation.
+
+This module provides a reader wrapper that stores the parsed output of another
+reader on disk, so unchanged files are not parsed again on later runs.
+"""
+
+import zlib
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from diskcache import Cache
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict, override
+
+from beancount_daoru.reader import Document
+from beancount_daoru.reader import Reader as BaseReader
+from beancount_daoru.utils import file_digest
+
+# bump when the encoding of cached entries changes
+_FORMAT_VERSION = 1
+
+
+class _Payload(TypedDict):
+    captions: list[str]
+    headers: list[list[str]]
+    rows: list[tuple[int, list[str]]]
+
+
+_payload_validator = TypeAdapter(_Payload)
+
+
+class Reader(BaseReader):
+    """Reader that caches the output of another reader on disk.
+
+    Entries are keyed by the content hash of the file and the configuration of
+    the wrapped reader (its `repr`, which only covers options changing the
+    output), and stored as compressed JSON in which
+    records sharing the same fields store the field names only once.
+    The cache is bounded by size and evicts the least recently used entries.
+    """
+
+    def __init__(
+        self,
+        reader: BaseReader,
+        /,
+        directory: Path,
+        size_limit: int = 1 << 30,
+    ) -> None:
+        """Initialize the cached reader.
+
+        Args:
+            reader: Reader whose output is cached.
+            directory: Directory of the on-disk cache.
+            size_limit: Maximum size of the cache in bytes.
+        """
+        self.__reader = reader
+        self.__cache = Cache(
+            directory,
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+        )
+
+    @override
+    def __repr__(self) -> str:
+        return f"{type(self).__module__}.{type(self).__qualname__}({self.__reader!r})"
+
+    @override
+    @contextmanager
+    def read(self, file: Path) -> Generator[Document]:
+        key = self._key(file)
+        cached = self.__cache.get(key)  # pyright: ignore[reportUnknownVariableType]
+        if isinstance(cached, bytes):
+            captions, records = _decode(cached)
+        else:
+            with self.__reader.read(file) as document:
+                captions = list(document.captions)
+                records = list(document.records)
+            _ = self.__cache.set(key, _encode(captions, records))
+        yield Document(captions=iter(captions), records=iter(records))
+
+    @override
+    def read_captions(self, file: Path) -> Iterator[str]:
+        with self.read(file) as document:
+            yield from document.captions
+
+    @override
+    def read_records(self, file: Path) -> Iterator[dict[str, str]]:
+        with self.read(file) as document:
+            yield from document.records
+
+    def _key(self, file: Path) -> str:
+        return f"{_FORMAT_VERSION}:{file_digest(file)}:{self.__reader!r}"
+
+
+def _encode(captions: list[str], records: list[dict[str, str]]) -> bytes:
+    # records of a file share few distinct field lists, store each only once
+    headers: dict[tuple[str, ...], int] = {}
+    rows: list[tuple[int, list[str]]] = []
+    for record in records:
+        index = headers.setdefault(tuple(record), len(headers))
+        rows.append((index, list(record.values())))
+    payload = _Payload(
+        captions=captions,
+        headers=[list(header) for header in headers],
+        rows=rows,
+    )
+    return zlib.compress(_payload_validator.dump_json(payload))
+
+
+def _decode(data: bytes) -> tuple[list[str], list[dict[str, str]]]:
+    payload = _payload_validator.validate_json(zlib.decompress(data))
+    headers = payload["headers"]
+    records = [
+        dict(zip(headers[index], values, strict=True))
+        for index, values in payload["rows"]
+    ]
+    return payload["captions"], records
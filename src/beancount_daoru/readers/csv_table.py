@@ -0,0 +1,88 @@
+"""CSV document reader implementation.
+
+This module provides a streaming reader for plain CSV exports based on the
+standard library, avoiding the per-row overhead of pyexcel for large bills.
+"""
+
+import csv
+from collections import deque
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from typing_extensions import override
+
+from beancount_daoru.reader import Document
+from beancount_daoru.reader import Reader as BaseReader
+
+
+class Reader(BaseReader):
+    """Reader for plain CSV files.
+
+    Decodes the file incrementally and yields rows as soon as they are parsed.
+    Follows the same header semantics as the Excel reader: the first `header`
+    rows (including empty ones) are captions, the next non-empty row holds the
+    field names of the records.
+    """
+
+    def __init__(
+        self,
+        /,
+        header: int,
+        encoding: str = "utf-8",
+    ) -> None:
+        """Initialize the CSV reader.
+
+        Args:
+            header: Number of header rows to skip before data.
+            encoding: Text encoding of the file.
+        """
+        self.__header = header
+        self.__encoding = encoding
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__module__}.{type(self).__qualname__}"
+            f"(header={self.__header!r}, encoding={self.__encoding!r})"
+        )
+
+    @override
+    @contextmanager
+    def read(self, file: Path) -> Generator[Document]:
+        with file.open(encoding=self.__encoding, newline="") as f:
+            rows = csv.reader(f)
+            preamble = islice(rows, self.__header)
+            yield Document(
+                captions=(cell for row in preamble for cell in row if cell),
+                records=self.__iter_records(preamble, rows),
+            )
+
+    @override
+    def read_captions(self, file: Path) -> Iterator[str]:
+        with self.read(file) as document:
+            yield from document.captions
+
+    @override
+    def read_records(self, file: Path) -> Iterator[dict[str, str]]:
+        with self.read(file) as document:
+            yield from document.records
+
+    def __iter_records(
+        self, preamble: Iterator[list[str]], rows: Iterator[list[str]]
+    ) -> Iterator[dict[str, str]]:
+        # skip the rest of captions without keeping them
+        _ = deque(preamble, maxlen=0)
+        rows = filter(any, rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        while header and not header[-1]:
+            _ = header.pop()
+        fields = [field.strip() for field in header]
+        width = len(fields)
+        for row in rows:
+            if len(row) < width:
+                row += [""] * (width - len(row))  # noqa: PLW2901
+            yield dict(zip(fields, map(str.strip, row), strict=False))
@@ -2,15 +2,20 @@
 
 This module provides functionality to read Excel and CSV files using pyexcel,
 handling various encodings and formats commonly used by Chinese financial platforms.
+Plain CSV and XLSX files are delegated to the streaming CSV and XLSX readers.
 """
 
-from collections.abc import Iterator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from itertools import islice, zip_longest
 from pathlib import Path
+from typing import cast
 
-import pyexcel
 from typing_extensions import TypedDict, Unpack, override
 
+from beancount_daoru.reader import Document
 from beancount_daoru.reader import Reader as BaseReader
+from beancount_daoru.readers import csv_table, xlsx
 
 
 class _ReaderKwargs(TypedDict, total=False):
@@ -22,6 +27,8 @@ class Reader(BaseReader):
 
     Uses pyexcel to read various spreadsheet formats, handling encoding
     and format variations commonly found in Chinese financial documents.
+    Files with a `.csv` or `.xlsx` suffix are read by `csv_table.Reader` or
+    `xlsx.Reader` instead.
     """
 
     def __init__(
@@ -38,34 +45,72 @@ class Reader(BaseReader):
         """
         self.__header = header
         self.__kwargs = kwargs
+        self.__csv_reader = csv_table.Reader(header, **kwargs)
+        self.__xlsx_reader = xlsx.Reader(header)
+
+    @override
+    def __repr__(self) -> str:
+        arguments = ", ".join(
+            f"{key}={value!r}"
+            for key, value in {"header": self.__header, **self.__kwargs}.items()
+        )
+        return f"{type(self).__module__}.{type(self).__qualname__}({arguments})"
+
+    @override
+    @contextmanager
+    def read(self, file: Path) -> Generator[Document]:
+        match file.suffix.lower():
+            case ".csv":
+                delegate: BaseReader | None = self.__csv_reader
+            case ".xlsx":
+                delegate = self.__xlsx_reader
+            case _:
+                delegate = None
+        if delegate is not None:
+            with delegate.read(file) as document:
+                yield document
+            return
+
+        import pyexcel  # noqa: PLC0415
+
+        rows = cast(
+            "Iterator[list[object]]",
+            pyexcel.iget_array(
+                file_name=file,
+                auto_detect_int=False,
+                auto_detect_float=False,
+                auto_detect_datetime=False,
+                skip_empty_rows=False,
+                **self.__kwargs,
+            ),
+        )
+        try:
+            caption_rows = [row for row in islice(rows, self.__header) if row]
+            yield Document(
+                captions=(str(cell) for row in caption_rows for cell in row),
+                records=self.__iter_records(row for row in rows if row),
+            )
+        finally:
+            pyexcel.free_resources()
 
     @override
     def read_captions(self, file: Path) -> Iterator[str]:
-        for row in pyexcel.get_array(  # pyright: ignore[reportUnknownVariableType]
-            file_name=file,
-            row_limit=self.__header,
-            auto_detect_int=False,
-            auto_detect_float=False,
-            auto_detect_datetime=False,
-            skip_empty_rows=True,
-            **self.__kwargs,
-        ):
-            yield from row
+        with self.read(file) as document:
+            yield from document.captions
 
     @override
     def read_records(self, file: Path) -> Iterator[dict[str, str]]:
-        for row in pyexcel.iget_records(  # pyright: ignore[reportUnknownVariableType]
-            file_name=file,
-            start_row=self.__header,
-            auto_detect_int=False,
-            auto_detect_float=False,
-            auto_detect_datetime=False,
-            skip_empty_rows=True,
-            **self.__kwargs,
-        ):
+        with self.read(file) as document:
+            yield from document.records
+
+    def __iter_records(self, rows: Iterator[list[object]]) -> Iterator[dict[str, str]]:
+        header = next(rows, None)
+        if header is None:
+            return
+        for row in rows:
             yield {
-                self.__convert(key): self.__convert(value)  # pyright: ignore[reportUnknownArgumentType]
-                for key, value in row.items()  # pyright: ignore[reportUnknownVariableType]
+                self.__convert(key): self.__convert(value)
+                for key, value in zip_longest(header, row, fillvalue="")
             }
 
     def __convert(self, value: object) -> str:
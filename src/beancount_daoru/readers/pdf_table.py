@@ -4,51 +4,259 @@ This module provides functionality to read tabular data from PDF files using pdf
 handling the layout and text extraction complexities of Chinese financial documents.
 """
 
-from collections.abc import Iterator
+import math
+from bisect import bisect_right
+from collections.abc import Generator, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
 from pathlib import Path
+from typing import NamedTuple
 
 import pdfplumber
+from pdfplumber.page import Page
+from pdfplumber.table import TableSettings, merge_edges
+from pdfplumber.utils.text import extract_text
 from typing_extensions import override
 
+from beancount_daoru.reader import Document
 from beancount_daoru.reader import Reader as BaseReader
 
 BBox = tuple[int | float, int | float, int | float, int | float]
 
+# number of page ranges per worker, smaller ranges balance the load better
+_CHUNKS_PER_WORKER = 4
+
+_TABLE_SETTINGS = TableSettings.resolve(None)
+
+
+class TableTemplate(NamedTuple):
+    """Fixed layout of the transaction table of a statement format.
+
+    Attributes:
+        columns: Ascending x positions of the column boundaries, including the
+            left border of the first and the right border of the last column.
+        header: Header row of the table, used to verify that a page follows
+            the template.
+    """
+
+    columns: tuple[float, ...]
+    header: tuple[str, ...]
+
 
 class Reader(BaseReader):
     """Reader for PDF files containing tabular data.
 
     Uses pdfplumber to extract tables from PDF documents, focusing on specific
     bounding boxes to isolate transaction tables from other content.
+
+    With a table template the column boundaries are known in advance, so table
+    detection is skipped: rows are split at the horizontal rulings and text is
+    assigned to cells directly. Pages whose first row does not match the header
+    of the template fall back to table detection.
     """
 
     def __init__(
         self,
         /,
         table_bbox: BBox,
+        workers: int = 1,
+        template: TableTemplate | None = None,
+        learn_template: bool = False,  # noqa: FBT001, FBT002
     ) -> None:
         """Initialize the PDF table reader.
 
         Args:
             table_bbox: Bounding box (x0, y0, x1, y1) defining the table area.
+            workers: Number of worker processes extracting tables of page ranges
+                in parallel. Records are always yielded in page order.
+            template: Fixed layout of the table.
+            learn_template: Whether to learn the template from the first detected
+                table of each file if none is given, and reuse it for the later
+                pages of the file.
         """
         self.__table_bbox = table_bbox
+        self.__workers = workers
+        self.__template = template
+        self.__learn_template = learn_template
 
     @override
-    def read_captions(self, file: Path) -> Iterator[str]:
+    def __repr__(self) -> str:
+        # workers and templates do not change the records, so they are left out
+        # to share cached output between configurations
+        return (
+            f"{type(self).__module__}.{type(self).__qualname__}"
+            f"(table_bbox={self.__table_bbox!r})"
+        )
+
+    @override
+    @contextmanager
+    def read(self, file: Path) -> Generator[Document]:
+        # a learned template only applies to the file it was learned from
+        extractor = _TableExtractor(
+            self.__table_bbox, self.__template, self.__learn_template
+        )
         with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                yield page.outside_bbox(self.__table_bbox).extract_text_simple()
+            if self.__workers > 1:
+                records = self.__iter_records_parallel(file, len(pdf.pages), extractor)
+            else:
+                records = self.__iter_records(pdf.pages, extractor)
+            yield Document(
+                captions=self.__iter_captions(pdf.pages),
+                records=records,
+            )
+
+    @override
+    def read_captions(self, file: Path) -> Iterator[str]:
+        with self.read(file) as document:
+            yield from document.captions
 
     @override
     def read_records(self, file: Path) -> Iterator[dict[str, str]]:
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                table = page.within_bbox(self.__table_bbox).extract_table()
-                if table:
-                    header = [value or "" for value in table[0]]
-                    for row in table[1:]:
-                        yield {
-                            field: (value or "").strip()
-                            for field, value in zip(header, row, strict=True)
-                        }
+        with self.read(file) as document:
+            yield from document.records
+
+    def __iter_captions(self, pages: Sequence[Page]) -> Iterator[str]:
+        for page in pages:
+            yield page.outside_bbox(self.__table_bbox).extract_text_simple()
+
+    def __iter_records(
+        self, pages: Sequence[Page], extractor: "_TableExtractor"
+    ) -> Iterator[dict[str, str]]:
+        for page in pages:
+            records = extractor.extract_records(page)
+            # parsed objects are shared with captions, release them once done
+            page.close()
+            yield from records
+
+    def __iter_records_parallel(
+        self, file: Path, page_count: int, extractor: "_TableExtractor"
+    ) -> Iterator[dict[str, str]]:
+        chunk_size = max(
+            1, math.ceil(page_count / (self.__workers * _CHUNKS_PER_WORKER))
+        )
+        page_ranges = [
+            list(range(start, min(start + chunk_size, page_count + 1)))
+            for start in range(1, page_count + 1, chunk_size)
+        ]
+        if not page_ranges:
+            return
+        # learn the template once here instead of in every worker
+        with pdfplumber.open(file, pages=page_ranges[0][:1]) as pdf:
+            extractor.prepare(pdf.pages[0])
+        executor = ProcessPoolExecutor(max_workers=self.__workers)
+        try:
+            # map keeps the order of page ranges, so records stay in page order
+            for records in executor.map(
+                _read_page_range,
+                repeat(file),
+                repeat(extractor),
+                page_ranges,
+            ):
+                yield from records
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+class _TableExtractor:
+    def __init__(
+        self,
+        table_bbox: BBox,
+        template: TableTemplate | None,
+        learn_template: bool,  # noqa: FBT001
+    ) -> None:
+        self.__table_bbox = table_bbox
+        self.__learn_template = learn_template
+        self.template: TableTemplate | None = template
+
+    def prepare(self, page: Page) -> None:
+        if self.template is None and self.__learn_template:
+            _ = self.__detect_table(page.within_bbox(self.__table_bbox))
+
+    def extract_records(self, page: Page) -> list[dict[str, str]]:
+        cropped = page.within_bbox(self.__table_bbox)
+        table = None
+        if self.template is not None:
+            table = self.__assign_table(cropped, self.template)
+        if table is None:
+            table = self.__detect_table(cropped)
+        if not table:
+            return []
+        header = table[0]
+        return [
+            {field: value.strip() for field, value in zip(header, row, strict=True)}
+            for row in table[1:]
+        ]
+
+    def __detect_table(self, page: Page) -> list[list[str]] | None:
+        table = page.find_table(_TABLE_SETTINGS)
+        if table is None:
+            return None
+        rows = [[value or "" for value in row] for row in table.extract()]
+        if rows and self.template is None and self.__learn_template:
+            columns = {cell[0] for cell in table.cells} | {
+                cell[2] for cell in table.cells
+            }
+            self.template = TableTemplate(
+                columns=tuple(sorted(columns)),
+                header=tuple(rows[0]),
+            )
+        return rows
+
+    def __assign_table(
+        self, page: Page, template: TableTemplate
+    ) -> list[list[str]] | None:
+        columns = template.columns
+        rows = self.__row_boundaries(page, columns)
+        if len(rows) < 2:  # noqa: PLR2004
+            return None
+
+        cells: list[list[list[dict[str, object]]]] = [
+            [[] for _ in columns[1:]] for _ in rows[1:]
+        ]
+        # same midpoint rule as pdfplumber uses to put chars into cells
+        for char in page.chars:
+            v_mid: float = (char["top"] + char["bottom"]) / 2  # pyright: ignore[reportAny]
+            h_mid: float = (char["x0"] + char["x1"]) / 2  # pyright: ignore[reportAny]
+            row = bisect_right(rows, v_mid) - 1
+            column = bisect_right(columns, h_mid) - 1
+            if 0 <= row < len(cells) and 0 <= column < len(columns) - 1:
+                cells[row][column].append(char)
+
+        table = [
+            [extract_text(chars) if chars else "" for chars in row] for row in cells
+        ]
+        if tuple(table[0]) != template.header:
+            return None
+        return table
+
+    def __row_boundaries(self, page: Page, columns: tuple[float, ...]) -> list[float]:
+        settings = _TABLE_SETTINGS
+        edges = merge_edges(
+            [edge for edge in page.edges if edge["orientation"] == "h"],
+            snap_x_tolerance=settings.snap_x_tolerance,
+            snap_y_tolerance=settings.snap_y_tolerance,
+            join_x_tolerance=settings.join_x_tolerance,
+            join_y_tolerance=settings.join_y_tolerance,
+        )
+        tolerance = settings.intersection_x_tolerance
+        # only rulings crossing the whole table separate its rows
+        return sorted(
+            {
+                float(edge["top"])  # pyright: ignore[reportAny]
+                for edge in edges
+                if edge["x0"] <= columns[0] + tolerance
+                and edge["x1"] >= columns[-1] - tolerance
+            }
+        )
+
+
+def _read_page_range(
+    file: Path, extractor: _TableExtractor, page_numbers: list[int]
+) -> list[dict[str, str]]:
+    records: list[dict[str, str]] = []
+    with pdfplumber.open(file, pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            records.extend(extractor.extract_records(page))
+            page.close()
+    return records
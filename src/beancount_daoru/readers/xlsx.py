@@ -0,0 +1,315 @@
+"""XLSX document reader implementation.
+
+This module provides a streaming reader for XLSX workbooks that iterates the
+sheet XML inside the zip container, keeping memory usage independent of the
+number of rows.
+"""
+
+import re
+import zipfile
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from itertools import islice, zip_longest
+from pathlib import Path, PurePosixPath
+from typing import IO, Literal, cast
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element, iterparse
+
+from typing_extensions import override
+
+from beancount_daoru.reader import Document
+from beancount_daoru.reader import Reader as BaseReader
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_WORKBOOK = "xl/workbook.xml"
+_WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+_SHARED_STRINGS = "xl/sharedStrings.xml"
+_STYLES = "xl/styles.xml"
+_DEFAULT_SHEET = "xl/worksheets/sheet1.xml"
+
+_COLUMN_PATTERN = re.compile(r"[A-Z]+")
+
+# built-in number formats of dates and times, other built-in ids are numbers
+_BUILTIN_FORMATS = {
+    14: "mm-dd-yy",
+    15: "d-mmm-yy",
+    16: "d-mmm",
+    17: "mmm-yy",
+    18: "h:mm am/pm",
+    19: "h:mm:ss am/pm",
+    20: "h:mm",
+    21: "h:mm:ss",
+    22: "m/d/yy h:mm",
+    45: "mm:ss",
+    46: "[h]:mm:ss",
+    47: "mmss.0",
+}
+# formats of times, values of other date formats below one day are times too
+_TIME_FORMATS = frozenset(
+    {"h:mm", "h:mm:ss", "hh:mm:ss", "mm:ss", "[h]:mm:ss", "mmss.0"}
+)
+# same detection of custom date formats as pyexcel
+_DATE_FORMAT_PATTERN = re.compile(r".*[hsmdy]")
+_ELAPSED_FORMAT_PATTERN = re.compile(r".*\[.*[dmhys].*\]")
+
+_SECONDS_PER_DAY = 24 * 60 * 60
+# epochs of serial dates, spreadsheet dates carry no timezone
+_EPOCH = datetime(1899, 12, 30)  # noqa: DTZ001
+_EPOCH_1904 = datetime(1904, 1, 1)  # noqa: DTZ001
+
+_NumberKind = Literal["date", "time", "number"]
+
+
+class Reader(BaseReader):
+    """Reader for XLSX files.
+
+    Streams the rows of the first sheet with `iterparse`, discarding each row
+    once it is converted, and resolves shared strings on demand. Follows the
+    same header semantics as the Excel reader: the first `header` rows
+    (including empty ones) are captions, the next non-empty row holds the field
+    names of the records. Numeric cells with a date or time number format are
+    converted like pyexcel does (e.g. `2019-09-24 10:10:11` instead of the
+    stored serial number), other cell values are returned as stored.
+    """
+
+    def __init__(
+        self,
+        /,
+        header: int,
+    ) -> None:
+        """Initialize the XLSX reader.
+
+        Args:
+            header: Number of header rows to skip before data.
+        """
+        self.__header = header
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__module__}.{type(self).__qualname__}"
+            f"(header={self.__header!r})"
+        )
+
+    @override
+    @contextmanager
+    def read(self, file: Path) -> Generator[Document]:
+        with zipfile.ZipFile(file) as archive:
+            shared_strings = _SharedStrings(archive)
+            sheet_name, date1904 = _read_workbook(archive)
+            styles = _Styles(archive, date1904=date1904)
+            try:
+                with archive.open(sheet_name) as sheet:
+                    rows = _iter_rows(sheet, shared_strings, styles)
+                    caption_rows = [row for row in islice(rows, self.__header) if row]
+                    yield Document(
+                        captions=(cell for row in caption_rows for cell in row),
+                        records=self.__iter_records(row for row in rows if row),
+                    )
+            finally:
+                shared_strings.close()
+
+    @override
+    def read_captions(self, file: Path) -> Iterator[str]:
+        with self.read(file) as document:
+            yield from document.captions
+
+    @override
+    def read_records(self, file: Path) -> Iterator[dict[str, str]]:
+        with self.read(file) as document:
+            yield from document.records
+
+    def __iter_records(self, rows: Iterator[list[str]]) -> Iterator[dict[str, str]]:
+        header = next(rows, None)
+        if header is None:
+            return
+        fields = [field.strip() for field in header]
+        for row in rows:
+            yield {
+                key: value.strip()
+                for key, value in zip_longest(fields, row, fillvalue="")
+            }
+
+
+class _SharedStrings:
+    """Shared string table parsed incrementally up to the requested index."""
+
+    def __init__(self, archive: zipfile.ZipFile) -> None:
+        self.__strings: list[str] = []
+        self.__stream: IO[bytes] | None = None
+        self.__items: Iterator[str] = iter(())
+        if _SHARED_STRINGS in archive.NameToInfo:
+            self.__stream = archive.open(_SHARED_STRINGS)
+            self.__items = self.__iter_items(self.__stream)
+
+    def __getitem__(self, index: int) -> str:
+        strings = self.__strings
+        if index >= len(strings):
+            strings.extend(islice(self.__items, index + 1 - len(strings)))
+        return strings[index]
+
+    def close(self) -> None:
+        if self.__stream is not None:
+            self.__stream.close()
+
+    def __iter_items(self, stream: IO[bytes]) -> Iterator[str]:
+        root: Element | None = None
+        for event, element in _iterparse(stream):
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            if element.tag == f"{_MAIN_NS}si":
+                yield _parse_shared_string(element)
+                if root is not None:
+                    root.clear()
+
+
+def _parse_shared_string(item: Element) -> str:
+    if (text := item.find(f"{_MAIN_NS}t")) is not None:
+        return text.text or ""
+    # rich text, phonetic runs (rPh) are not part of the value
+    return "".join(
+        run.findtext(f"{_MAIN_NS}t") or "" for run in item.iterfind(f"{_MAIN_NS}r")
+    )
+
+
+class _Styles:
+    """Number formats of the cell styles, applied to numeric cell values."""
+
+    def __init__(self, archive: zipfile.ZipFile, *, date1904: bool) -> None:
+        self.__epoch = _EPOCH_1904 if date1904 else _EPOCH
+        self.__kinds: list[_NumberKind] = []
+        if _STYLES not in archive.NameToInfo:
+            return
+        with archive.open(_STYLES) as stream:
+            root = ElementTree.parse(stream).getroot()  # noqa: S314
+        codes = dict(_BUILTIN_FORMATS)
+        for number_format in root.iter(f"{_MAIN_NS}numFmt"):
+            code = number_format.get("formatCode", "").lower().replace("\\", "")
+            codes[int(number_format.get("numFmtId", "0"))] = code
+        if (cell_formats := root.find(f"{_MAIN_NS}cellXfs")) is not None:
+            self.__kinds = [
+                _number_kind(codes.get(int(cell_format.get("numFmtId", "0")), ""))
+                for cell_format in cell_formats.iterfind(f"{_MAIN_NS}xf")
+            ]
+
+    def format(self, value: str, style: str | None) -> str:
+        if style is None or not 0 <= (index := int(style)) < len(self.__kinds):
+            return value
+        kind = self.__kinds[index]
+        try:
+            number = float(value)
+            if kind == "date" and number >= 1:
+                return str(self.__epoch + timedelta(number))
+            if kind != "number":
+                seconds = round((number % 1) * _SECONDS_PER_DAY)
+                minutes, second = divmod(seconds, 60)
+                return str(time(minutes // 60 % 24, minutes % 60, second))
+        except (ValueError, OverflowError):
+            return value
+        if "e" in value.lower():
+            # pyexcel expands exponents of formatted numbers
+            return f"{number:f}".rstrip("0").rstrip(".")
+        return value
+
+
+def _number_kind(code: str) -> _NumberKind:
+    if code in _TIME_FORMATS:
+        return "time"
+    if _DATE_FORMAT_PATTERN.match(code) and not _ELAPSED_FORMAT_PATTERN.match(code):
+        return "date"
+    return "number"
+
+
+def _read_workbook(archive: zipfile.ZipFile) -> tuple[str, bool]:
+    date1904 = False
+    try:
+        with archive.open(_WORKBOOK) as workbook:
+            for _, element in _iterparse(workbook):
+                if element.tag == f"{_MAIN_NS}workbookPr":
+                    date1904 = element.get("date1904", "").lower() in {"1", "true"}
+                if element.tag == f"{_MAIN_NS}sheet":
+                    sheet = element
+                    break
+            else:
+                return _DEFAULT_SHEET, date1904
+        with archive.open(_WORKBOOK_RELS) as rels:
+            target = next(
+                element.get("Target", "")
+                for _, element in _iterparse(rels)
+                if element.tag == f"{_PKG_REL_NS}Relationship"
+                and element.get("Id") == sheet.get(f"{_REL_NS}id")
+            )
+    except (KeyError, StopIteration):
+        return _DEFAULT_SHEET, date1904
+    if target.startswith("/"):
+        return target.lstrip("/"), date1904
+    return str(PurePosixPath("xl", target)), date1904
+
+
+def _iter_rows(
+    sheet: IO[bytes], shared_strings: _SharedStrings, styles: _Styles
+) -> Iterator[list[str]]:
+    sheet_data: Element | None = None
+    for event, element in _iterparse(sheet):
+        if event == "start":
+            if element.tag == f"{_MAIN_NS}sheetData":
+                sheet_data = element
+            continue
+        if element.tag == f"{_MAIN_NS}row":
+            yield _parse_row(element, shared_strings, styles)
+            if sheet_data is not None:
+                # drop parsed rows so memory does not grow with the sheet
+                sheet_data.clear()
+
+
+def _parse_row(
+    row: Element, shared_strings: _SharedStrings, styles: _Styles
+) -> list[str]:
+    values: list[str] = []
+    for cell in row.iterfind(f"{_MAIN_NS}c"):
+        if (ref := cell.get("r")) is not None and (match := _COLUMN_PATTERN.match(ref)):
+            padding = _column_index(match.group()) - len(values)
+            if padding > 0:
+                values.extend([""] * padding)
+        values.append(_parse_cell(cell, shared_strings, styles))
+    # trailing empty cells are not part of the row, like in pyexcel
+    while values and not values[-1]:
+        _ = values.pop()
+    return values
+
+
+def _parse_cell(cell: Element, shared_strings: _SharedStrings, styles: _Styles) -> str:
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        return "".join(text.text or "" for text in cell.iter(f"{_MAIN_NS}t"))
+    value = cell.findtext(f"{_MAIN_NS}v")
+    if value is None:
+        return ""
+    match cell_type:
+        case "s":
+            return shared_strings[int(value)]
+        case "b":
+            return "TRUE" if value == "1" else "FALSE"
+        case "n":
+            return styles.format(value, cell.get("s"))
+        case _:
+            return value
+
+
+def _iterparse(source: IO[bytes]) -> Iterator[tuple[str, Element]]:
+    # expat of supported python versions rejects entity expansion attacks
+    events = iterparse(source, events=("start", "end"))  # noqa: S314
+    return cast("Iterator[tuple[str, Element]]", events)
+
+
+def _column_index(column: str) -> int:
+    index = 0
+    for char in column:
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
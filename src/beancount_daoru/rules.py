@@ -0,0 +1,198 @@
+"""Rule tables for classifying transaction records.
+
+This module provides a small rule engine used by parsers to map combinations
+of record field values (e.g. direction, status and type of a transaction) to
+actions. Rules are declared as data and compiled into hash tables, so the
+common case of exactly matching values is resolved with a few dict lookups.
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+from collections.abc import Set as AbstractSet
+from itertools import product
+from typing import Generic, NamedTuple, TypeAlias, TypeVar
+
+from typing_extensions import override
+
+from beancount_daoru.importer import ParserError
+
+_T = TypeVar("_T")
+
+
+class Affix(NamedTuple):
+    """Pattern matching strings that start and end with the given affixes.
+
+    The part of the string between the prefix and the suffix is captured and
+    passed along with the action of the matched rule.
+
+    Attributes:
+        prefix: Required start of the string.
+        suffix: Required end of the string.
+    """
+
+    prefix: str = ""
+    suffix: str = ""
+
+    def capture(self, value: object) -> str | None:
+        """Capture the part of a value between the affixes.
+
+        Args:
+            value: Value of a record field.
+
+        Returns:
+            The captured part, or None if the value does not match.
+        """
+        if (
+            isinstance(value, str)
+            and value.startswith(self.prefix)
+            and value.endswith(self.suffix)
+        ):
+            # affixes may overlap (e.g. "余额宝-收益发放"), leaving nothing between
+            end = max(len(self.prefix), len(value) - len(self.suffix))
+            return value[len(self.prefix) : end]
+        return None
+
+
+class _Any:
+    @override
+    def __repr__(self) -> str:
+        return "ANY"
+
+
+ANY = _Any()
+"""Pattern matching any value of a field."""
+
+FieldPattern: TypeAlias = str | AbstractSet[str | None] | Affix | _Any | None
+"""Pattern of a single field.
+
+A string or None matches exactly, a set matches any of its elements, an
+`Affix` matches by prefix and suffix, and `ANY` matches everything.
+"""
+
+
+class RuleTable(Generic[_T]):
+    """Ordered rules mapping field values of records to actions.
+
+    As with a `match` statement, the first matching rule wins. Rules without
+    affix patterns are compiled into hash tables, one per combination of
+    wildcard fields, while rules with affix patterns are tried in order as a
+    fallback when they precede the best hash table hit.
+    """
+
+    def __init__(self, fields: Sequence[str], rules: Iterable["Rule[_T]"], /) -> None:
+        """Initialize the rule table.
+
+        Args:
+            fields: Names of the record fields the rules match on.
+            rules: Rules in order of precedence.
+
+        Raises:
+            ValueError: If a rule does not have a pattern for every field.
+        """
+        self.__fields = tuple(fields)
+        self.__rules = list(rules)
+        self.__exact: dict[tuple[int, ...], dict[tuple[object, ...], int]] = {}
+        self.__affix: list[int] = []
+        for index, (patterns, _) in enumerate(self.__rules):
+            if len(patterns) != len(self.__fields):
+                msg = f"rule {patterns!r} does not match fields {self.__fields!r}"
+                raise ValueError(msg)
+            if any(isinstance(pattern, Affix) for pattern in patterns):
+                self.__affix.append(index)
+                continue
+            positions = tuple(
+                position
+                for position, pattern in enumerate(patterns)
+                if not isinstance(pattern, _Any)
+            )
+            table = self.__exact.setdefault(positions, {})
+            for key in product(*(_alternatives(patterns[i]) for i in positions)):
+                _ = table.setdefault(key, index)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Names of the record fields the rules match on.
+
+        Returns:
+            The field names.
+        """
+        return self.__fields
+
+    def extended(self, rules: Iterable["Rule[_T]"]) -> "RuleTable[_T]":
+        """Create a table with additional rules taking precedence.
+
+        Args:
+            rules: Rules to check before the rules of this table.
+
+        Returns:
+            The new rule table.
+        """
+        return RuleTable(self.__fields, [*rules, *self.__rules])
+
+    def lookup(self, record: Mapping[str, object]) -> tuple[_T, tuple[str, ...]]:
+        """Find the action of the first rule matching a record.
+
+        Args:
+            record: Record providing the values of the fields.
+
+        Raises:
+            ParserError: If no rule matches, naming the fields looked up.
+
+        Returns:
+            The action of the matched rule, and the parts of the values captured
+            by its affix patterns.
+        """
+        return self.__lookup(record, ())
+
+    def __lookup(
+        self, record: Mapping[str, object], outer_fields: tuple[str, ...]
+    ) -> tuple[_T, tuple[str, ...]]:
+        fields = (*outer_fields, *self.__fields)
+        values = tuple(record[field] for field in self.__fields)
+        best = len(self.__rules)
+        for positions, table in self.__exact.items():
+            index = table.get(tuple(values[i] for i in positions), best)
+            best = min(best, index)
+        captures: tuple[str, ...] = ()
+        for index in self.__affix:
+            if index > best:
+                break
+            if (matched := _capture(self.__rules[index][0], values)) is not None:
+                best, captures = index, matched
+                break
+        if best == len(self.__rules):
+            raise ParserError(*fields)
+        action = self.__rules[best][1]
+        if isinstance(action, RuleTable):
+            return action.__lookup(record, fields)  # noqa: SLF001  # pyright: ignore[reportUnknownVariableType]
+        return action, captures
+
+
+Rule: TypeAlias = tuple[tuple[FieldPattern, ...], _T | RuleTable[_T]]
+"""Patterns of the fields of a table paired with the action of the rule.
+
+The action may be another table, which is then looked up with the fields of
+that table.
+"""
+
+
+def _alternatives(pattern: FieldPattern) -> Iterable[str | None]:
+    if isinstance(pattern, AbstractSet):
+        return pattern
+    return (pattern,)  # pyright: ignore[reportReturnType]
+
+
+def _capture(
+    patterns: tuple[FieldPattern, ...], values: tuple[object, ...]
+) -> tuple[str, ...] | None:
+    captures: list[str] = []
+    for pattern, value in zip(patterns, values, strict=True):
+        if isinstance(pattern, Affix):
+            if (captured := pattern.capture(value)) is None:
+                return None
+            captures.append(captured)
+        elif isinstance(pattern, AbstractSet):
+            if value not in pattern:
+                return None
+        elif not isinstance(pattern, _Any) and value != pattern:
+            return None
+    return tuple(captures)
@@ -7,6 +7,10 @@ parts of the beancount_daoru package to perform common operations.
 import itertools
 import re
 from collections.abc import Iterator
+from hashlib import blake2b
+from pathlib import Path
+
+_CHUNK_SIZE = 1 << 20
 
 
 def search_patterns(
@@ -38,3 +42,19 @@ def search_patterns(
         _find_all(text_iter, pattern)
         for text_iter, pattern in zip(text_iters, patterns, strict=False)
     )
+
+
+def file_digest(file: Path) -> str:
+    """Compute the content hash of a file.
+
+    Args:
+        file: Path of the file.
+
+    Returns:
+        The hexadecimal BLAKE2b digest of the file content.
+    """
+    hasher = blake2b(digest_size=16)
+    with file.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,19 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+from typing_extensions import override
+
+from beancount_daoru.reader import Document
+from beancount_daoru.readers import csv_table
+
+
+class CountingReader(csv_table.Reader):
+    count: int = 0
+
+    @override
+    @contextmanager
+    def read(self, file: Path) -> Generator[Document]:
+        self.count += 1
+        with super().read(file) as document:
+            yield document
@@ -0,0 +1,247 @@
+import asyncio
+import datetime
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from beancount import (
+    FLAG_OKAY,
+    Account,
+    Amount,
+    Close,
+    Directive,
+    Open,
+    Posting,
+    Transaction,
+)
+from openai.types.shared_params.response_format_json_schema import JSONSchema
+from pydantic import TypeAdapter, ValidationError
+
+from beancount_daoru.hooks.predict_missing_posting import (
+    _ChatBot,  # pyright: ignore[reportPrivateUsage]
+    _Encoder,  # pyright: ignore[reportPrivateUsage]
+    _HistoryIndex,  # pyright: ignore[reportPrivateUsage]
+    _Limiter,  # pyright: ignore[reportPrivateUsage]
+)
+
+
+class FakeEmbeddings:
+    def __init__(self) -> None:
+        self.requests: list[list[str]] = []
+
+    async def create(self, *, input: list[str], model: str) -> SimpleNamespace:  # noqa: A002
+        del model
+        self.requests.append(input)
+        await asyncio.sleep(0)
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(index=index, embedding=[float(len(text)), 1.0])
+                for index, text in enumerate(input)
+            ],
+            usage=SimpleNamespace(total_tokens=len(input)),
+        )
+
+
+def _encoder(
+    cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> tuple[_Encoder, FakeEmbeddings]:
+    encoder = _Encoder(
+        model_settings={
+            "name": "test",
+            "base_url": "http://localhost",
+            "api_key": "test",
+            "batch_size": 3,
+        },
+        cache_dir=cache_dir,
+    )
+    client = FakeEmbeddings()
+    monkeypatch.setattr(encoder, "_Encoder__embeddings_client", client)
+    return encoder, client
+
+
+def test_encoder_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    encoder, client = _encoder(tmp_path, monkeypatch)
+
+    async def encode(texts: list[str]) -> list[list[float]]:
+        return await asyncio.gather(*(encoder.encode(text) for text in texts))
+
+    texts = ["a", "bb", "a", "ccc", "dddd", "eeeee"]
+    assert [e[0] for e in asyncio.run(encode(texts))] == [1, 2, 1, 3, 4, 5]
+    assert client.requests == [["a", "bb", "ccc"], ["dddd", "eeeee"]]
+
+    assert [e[0] for e in asyncio.run(encode(["a", "ffffff"]))] == [1, 6]
+    assert client.requests[2:] == [["ffffff"]]
+
+
+def _transaction(day: int, narration: str) -> Transaction:
+    return Transaction(
+        meta={},
+        date=datetime.date(2020, 1, day),
+        flag=FLAG_OKAY,
+        payee=None,
+        narration=narration,
+        tags=frozenset(),
+        links=frozenset(),
+        postings=[
+            Posting("Assets:Cash", Amount(Decimal(-1), "CNY"), None, None, None, None),
+            Posting("Expenses:Food", Amount(Decimal(1), "CNY"), None, None, None, None),
+        ],
+    )
+
+
+def test_history_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    directory = tmp_path / "index"
+    opens = [
+        Open({}, datetime.date(2020, 1, 1), account, [], None)
+        for account in ("Assets:Cash", "Expenses:Food")
+    ]
+    lunch, dinner = _transaction(1, "lunch"), _transaction(2, "dinner")
+
+    def build(entries: Iterable[Directive]) -> tuple[list[str], list[Account]]:
+        encoder, client = _encoder(tmp_path, monkeypatch)
+        index = _HistoryIndex(encoder=encoder, ndim=2, directory=directory)
+        for entry in entries:
+            index.add(entry)
+        asyncio.run(index.build())
+        texts = [text for request in client.requests for text in request]
+        matches = asyncio.run(index.search(lunch, 3))
+        return texts, sorted(account for _, account, _ in matches)
+
+    texts, accounts = build([*opens, lunch])
+    assert len(texts) == len(lunch.postings)
+    assert accounts == ["Assets:Cash", "Expenses:Food"]
+    # the stored index is reused, only new transactions are encoded
+    assert build([*opens, lunch])[0] == []
+    assert len(build([*opens, lunch, dinner])[0]) == len(dinner.postings)
+    assert build([*opens, dinner])[0] == []
+
+    close = Close({}, datetime.date(2020, 2, 1), "Expenses:Food")
+    assert build([*opens, dinner, close]) == ([], ["Assets:Cash"])
+    assert [path.name for path in directory.iterdir()] == ["history.usearch"]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def test_limiter() -> None:
+    clock = FakeClock()
+    limiter = _Limiter(
+        max_concurrency=2,
+        requests_per_minute=None,
+        tokens_per_minute=6000,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    in_flight: list[int] = [0]
+    peak: list[int] = [0]
+
+    async def request(tokens: int) -> None:
+        async with limiter.limit(tokens):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0)
+            in_flight[0] -= 1
+
+    async def run() -> None:
+        _ = await asyncio.gather(*(request(1) for _ in range(8)))
+
+    asyncio.run(run())
+    assert peak == [2]
+    assert clock.sleeps == []
+
+    # a minute of tokens is available at once, then 100 tokens per second
+    clock.now += 60
+    asyncio.run(request(6000))
+    asyncio.run(request(10))
+    assert clock.sleeps == [pytest.approx(0.1)]
+
+    # tokens used beyond the estimate are taken from the next requests
+    clock.now += 60
+    limiter.settle(10, 6010)
+    asyncio.run(request(10))
+    assert clock.sleeps[1:] == [pytest.approx(0.2)]
+
+
+class FakeCompletions:
+    def __init__(self, contents: Iterable[str] = ()) -> None:
+        self.count: int = 0
+        self.contents: Iterator[str] = iter(contents)
+
+    async def create(self, **kwargs: object) -> SimpleNamespace:
+        del kwargs
+        self.count += 1
+        content = next(self.contents, f'"Expenses:{self.count}"')
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(total_tokens=1),
+        )
+
+
+def _chat_bot(
+    cache_dir: Path, monkeypatch: pytest.MonkeyPatch, client: FakeCompletions
+) -> _ChatBot:
+    chat_bot = _ChatBot(
+        model_settings={
+            "name": "test",
+            "base_url": "http://localhost",
+            "api_key": "test",
+        },
+        cache_dir=cache_dir,
+    )
+    monkeypatch.setattr(chat_bot, "_ChatBot__chat_client", client)
+    return chat_bot
+
+
+def test_chat_bot_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeCompletions()
+    chat_bot = _chat_bot(tmp_path, monkeypatch, client)
+    schema: JSONSchema = {"name": "account", "schema": {"enum": ["Expenses:1"]}}
+
+    async def complete(user_prompt: str, schema: JSONSchema) -> str:
+        return await chat_bot.complete(
+            user_prompt, system_prompt="system", response_format=schema, validate=str
+        )
+
+    assert asyncio.run(complete("a", schema)) == '"Expenses:1"'
+    assert asyncio.run(complete("a", schema)) == '"Expenses:1"'
+    assert asyncio.run(complete("b", schema)) == '"Expenses:2"'
+    # the set of accounts is part of the prompt
+    other: JSONSchema = {"name": "account", "schema": {"enum": ["Expenses:2"]}}
+    assert asyncio.run(complete("a", other)) == '"Expenses:3"'
+    assert client.count == 3  # noqa: PLR2004
+
+
+def test_chat_bot_invalid(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = FakeCompletions(["not json"])
+    chat_bot = _chat_bot(tmp_path, monkeypatch, client)
+    schema: JSONSchema = {"name": "account", "schema": {"enum": ["Expenses:2"]}}
+    validator = TypeAdapter[str](str)
+
+    async def complete() -> str:
+        return await chat_bot.complete(
+            "a",
+            system_prompt="system",
+            response_format=schema,
+            validate=validator.validate_json,
+        )
+
+    with pytest.raises(ValidationError):
+        _ = asyncio.run(complete())
+    # the invalid completion is not cached, so it is requested again
+    assert asyncio.run(complete()) == "Expenses:2"
+    assert asyncio.run(complete()) == "Expenses:2"
+    assert client.count == 2  # noqa: PLR2004
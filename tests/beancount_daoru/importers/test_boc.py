@@ -3,7 +3,13 @@ from decimal import Decimal
 
 import pytest
 
-from beancount_daoru.importer import Extra, Metadata, Posting, Transaction
+from beancount_daoru.importer import (
+    Extra,
+    Metadata,
+    Posting,
+    Transaction,
+    decoder_cache_info,
+)
 from beancount_daoru.importers.boc import Parser
 
 
@@ -53,6 +59,7 @@ PARSE_PARAMS_LIST = [
                 time=datetime.time(10, 0, 0),
                 type="结息",
                 place="其他",
+                transaction_id="20200101100000/1.00/1000.00",
             ),
             postings=(
                 Posting(
@@ -90,6 +97,7 @@ PARSE_PARAMS_LIST = [
                 type="网上快捷支付",
                 payee_account="Z1234567890123N",
                 place="银企对接",
+                transaction_id="20200102110000/-10.00/990.00",
             ),
             postings=(
                 Posting(
@@ -111,3 +119,13 @@ def test_parse(
     parser: Parser, record: dict[str, str], transaction: Transaction
 ) -> None:
     assert parser.parse(record) == transaction
+
+
+def test_parse_memoized(parser: Parser) -> None:
+    record, transaction = PARSE_PARAMS_LIST[0]
+    _ = parser.parse(record)
+    before = decoder_cache_info()["beancount_daoru.importers.boc._decode_amount"]
+    assert parser.parse(record) == transaction
+    after = decoder_cache_info()["beancount_daoru.importers.boc._decode_amount"]
+    assert after.hits == before.hits + 2
+    assert after.misses == before.misses
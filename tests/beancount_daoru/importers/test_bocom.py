@@ -62,6 +62,7 @@ TEST_PARAMS_LIST = [
                 type="存款利息",
                 payee_account="123456789012345123",
                 place="批处理",
+                transaction_id="20200101100000/1.00/1000.00",
             ),
             payee="应付个人活期储蓄存款利息",
             postings=(
@@ -107,6 +108,7 @@ TEST_PARAMS_LIST = [
                 type="网上支付",
                 payee_account="123456789",
                 place="支付宝（中国）网络技术有限公司",
+                transaction_id="20200102110000/10.00/990.00",
             ),
             postings=(
                 Posting(
@@ -156,3 +158,15 @@ def test_parse_error(parser: Parser, record: dict[str, str], message: str) -> No
     with pytest.raises(ParserError) as excinfo:
         _ = parser.parse(record)
     assert str(excinfo.value) == message
+
+
+def test_parse_many(parser: Parser) -> None:
+    records = [record for record, _ in TEST_PARAMS_LIST]
+    error_record, message = ERROR_PARAMS_LIST[0]
+    results = parser.parse_many([*records, error_record, *records])
+    transactions = [transaction for _, transaction in TEST_PARAMS_LIST]
+    assert results[: len(records)] == transactions
+    assert results[len(records) + 1 :] == transactions
+    error = results[len(records)]
+    assert isinstance(error, ParserError)
+    assert str(error) == message
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from beancount_daoru.readers import cached
+from tests.beancount_daoru.conftest import CountingReader
+
+CONTENT = (
+    "账户：user@example.com\n"
+    "交易时间,金额,备注\n"
+    "2020-01-01 10:00:00,1.00,\n"
+    "2020-01-02 11:00:00,2.00,其他\n"
+)
+
+
+def test_read(tmp_path: Path) -> None:
+    file = tmp_path / "bill.csv"
+    _ = file.write_text(CONTENT, encoding="utf-8")
+    inner = CountingReader(header=1)
+    reader = cached.Reader(inner, directory=tmp_path / "cache")
+
+    for _ in range(2):
+        assert list(reader.read_captions(file)) == ["账户：user@example.com"]
+        assert list(reader.read_records(file)) == [
+            {"交易时间": "2020-01-01 10:00:00", "金额": "1.00", "备注": ""},
+            {"交易时间": "2020-01-02 11:00:00", "金额": "2.00", "备注": "其他"},
+        ]
+    assert inner.count == 1
+
+    _ = file.write_text(CONTENT + "2020-01-03 12:00:00,3.00,\n", encoding="utf-8")
+    assert len(list(reader.read_records(file))) == 3  # noqa: PLR2004
+    assert inner.count == 2  # noqa: PLR2004
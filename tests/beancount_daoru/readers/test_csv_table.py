@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+
+from beancount_daoru.readers import csv_table
+
+CONTENT = (
+    "账单明细\n"
+    "账户：user@example.com\n"
+    "\n"
+    "----------明细列表----------\n"
+    "\n"
+    "交易时间  ,金额 ,备注,\n"
+    "2020-01-01 10:00:00 ,1.00 ,,\n"
+    "\n"
+    '2020-01-02 11:00:00,"2,000.00"\n'
+)
+
+
+@pytest.fixture
+def file(tmp_path: Path) -> Path:
+    path = tmp_path / "bill.csv"
+    _ = path.write_text(CONTENT, encoding="gbk")
+    return path
+
+
+def test_read(file: Path) -> None:
+    reader = csv_table.Reader(header=4, encoding="gbk")
+    with reader.read(file) as document:
+        assert next(document.captions) == "账单明细"
+        assert list(document.records) == [
+            {"交易时间": "2020-01-01 10:00:00", "金额": "1.00", "备注": ""},
+            {"交易时间": "2020-01-02 11:00:00", "金额": "2,000.00", "备注": ""},
+        ]
+
+
+def test_read_captions(file: Path) -> None:
+    reader = csv_table.Reader(header=4, encoding="gbk")
+    assert list(reader.read_captions(file)) == [
+        "账单明细",
+        "账户：user@example.com",
+        "----------明细列表----------",
+    ]
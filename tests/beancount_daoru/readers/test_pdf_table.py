@@ -0,0 +1,235 @@
+from pathlib import Path
+from typing import NamedTuple
+
+import pytest
+
+from beancount_daoru.readers import pdf_table
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+LINE_HEIGHT = 11
+RESOURCES = b"/Resources << /Font << /F1 3 0 R >> >>"
+
+
+class Layout(NamedTuple):
+    bbox: pdf_table.BBox
+    columns: tuple[int, ...]
+    header: list[str]
+
+
+SIMPLE = Layout(
+    bbox=(0, 100, 842, 500),
+    columns=(40, 140, 260, 380, 800),
+    header=["Date", "Amount", "Balance", "Memo"],
+)
+# same table area and column count as the Bank of China statements
+BOC = Layout(
+    bbox=(0, 125, 842, 420),
+    columns=(20, 80, 130, 170, 230, 300, 360, 420, 480, 560, 640, 720, 820),
+    header=[
+        "Date",
+        "Time",
+        "Currency",
+        "Amount",
+        "Balance",
+        "Type",
+        "Channel",
+        "Branch",
+        "Memo",
+        "Name",
+        "Account",
+        "Bank",
+    ],
+)
+# same table area and multi-line header cells as the Bank of Communications
+BOCOM = Layout(
+    bbox=(0, 148, 842, 491),
+    columns=(20, 100, 160, 240, 280, 360, 440, 560, 660, 740, 820),
+    header=[
+        "Trans Date\nDate",
+        "Trans Time\nTime",
+        "Trading Type\nType",
+        "Dc\nFlg",
+        "Trans Amt\nAmount",
+        "Balance",
+        "Payment Receipt\nAccount",
+        "Payment Receipt\nAccount Name",
+        "Place",
+        "Abstract",
+    ],
+)
+
+
+def _page_content(layout: Layout, rows: list[list[str]]) -> bytes:
+    # rows of the ruled table, the first row is the header
+    tops = [layout.bbox[1] + 5]
+    for row in rows:
+        lines = max(cell.count("\n") + 1 for cell in row)
+        tops.append(tops[-1] + 8 + LINE_HEIGHT * lines)
+    left, right = layout.columns[0], layout.columns[-1]
+    commands = ["0.5 w"]
+    commands.extend(
+        f"{left} {PAGE_HEIGHT - top} m {right} {PAGE_HEIGHT - top} l S" for top in tops
+    )
+    commands.extend(
+        f"{x} {PAGE_HEIGHT - tops[0]} m {x} {PAGE_HEIGHT - tops[-1]} l S"
+        for x in layout.columns
+    )
+    for top, row in zip(tops, rows, strict=False):
+        for x, cell in zip(layout.columns, row, strict=False):
+            for index, line in enumerate(cell.splitlines()):
+                y = PAGE_HEIGHT - (top + 12 + LINE_HEIGHT * index)
+                commands.append(f"BT /F1 9 Tf {x + 3} {y} Td ({line}) Tj ET")
+    commands.append(f"BT /F1 9 Tf 40 {PAGE_HEIGHT - 40} Td (Statement) Tj ET")
+    return "\n".join(commands).encode()
+
+
+def write_pdf(path: Path, layout: Layout, pages: list[list[list[str]]]) -> None:
+    """Write a PDF with a ruled table of the header and rows on each page."""
+    page_ids = [4 + 2 * index for index in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        + b"] /Count %d >>" % len(pages),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, rows in zip(page_ids, pages, strict=True):
+        content = _page_content(layout, [layout.header, *rows])
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] %s /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, RESOURCES, page_id + 1)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        data += b"%010d 00000 n \n" % offset
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    _ = path.write_bytes(bytes(data))
+
+
+PAGES = [
+    [
+        [f"2020-01-{page * 3 + row + 1:02d}", f"{row}.00", f"{page}0.00", f"p{page}"]
+        for row in range(3)
+    ]
+    for page in range(5)
+]
+BOC_PAGES = [
+    [
+        [
+            f"2020-01-{page * 4 + row + 1:02d}",
+            f"1{row}:00:00",
+            "CNY",
+            f"-{row}0.00",
+            f"1,00{page}.00",
+            "Payment",
+            "Online",
+            "",
+            "Lunch" if row % 2 else "----------",
+            "Shop",
+            f"62{page}{row}",
+            "Bank",
+        ]
+        for row in range(4)
+    ]
+    for page in range(3)
+]
+BOCOM_PAGES = [
+    [
+        [
+            f"2020-01-{page * 4 + row + 1:02d}",
+            f"1{row}:00:00",
+            "Transfer",
+            "Dr" if row % 2 else "Cr",
+            f"{row}0.00",
+            f"1,00{page}.00",
+            f"6222 0{page}{row}",
+            "Long Account\nName Ltd" if row % 2 else "Shop",
+            "Online",
+            "",
+        ]
+        for row in range(4)
+    ]
+    for page in range(3)
+]
+
+
+@pytest.fixture
+def file(tmp_path: Path) -> Path:
+    path = tmp_path / "statement.pdf"
+    write_pdf(path, SIMPLE, PAGES)
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_records(file: Path, workers: int) -> None:
+    reader = pdf_table.Reader(table_bbox=SIMPLE.bbox, workers=workers)
+    assert list(reader.read_records(file)) == [
+        dict(zip(SIMPLE.header, row, strict=True)) for rows in PAGES for row in rows
+    ]
+
+
+def test_read_captions(file: Path) -> None:
+    reader = pdf_table.Reader(table_bbox=SIMPLE.bbox, workers=2)
+    assert list(reader.read_captions(file)) == ["Statement"] * len(PAGES)
+
+
+@pytest.mark.parametrize(
+    ("layout", "pages"), [(BOC, BOC_PAGES), (BOCOM, BOCOM_PAGES)], ids=["boc", "bocom"]
+)
+@pytest.mark.parametrize("workers", [1, 2])
+def test_template(
+    tmp_path: Path, layout: Layout, pages: list[list[list[str]]], workers: int
+) -> None:
+    path = tmp_path / "statement.pdf"
+    write_pdf(path, layout, pages)
+    expected = list(pdf_table.Reader(table_bbox=layout.bbox).read_records(path))
+    assert expected == [
+        dict(zip(layout.header, row, strict=True)) for rows in pages for row in rows
+    ]
+
+    template = pdf_table.TableTemplate(
+        columns=tuple(map(float, layout.columns)), header=tuple(layout.header)
+    )
+    for reader in [
+        pdf_table.Reader(table_bbox=layout.bbox, workers=workers, template=template),
+        pdf_table.Reader(table_bbox=layout.bbox, workers=workers, learn_template=True),
+    ]:
+        assert list(reader.read_records(path)) == expected
+
+
+def test_learn_template_per_file(tmp_path: Path) -> None:
+    layout = SIMPLE._replace(header=["A", "B", "C", "D"])
+    paths = [tmp_path / "first.pdf", tmp_path / "second.pdf"]
+    write_pdf(paths[0], layout, PAGES)
+    # the header fits the columns of the first file, so a template learned from
+    # it would split the wider first column of the second file
+    write_pdf(
+        paths[1],
+        layout._replace(columns=(40, 250, 300, 380, 800)),
+        [[["2020-01-01 with a long memo", "1.00", "2.00", "x"]]],
+    )
+    reader = pdf_table.Reader(table_bbox=layout.bbox, learn_template=True)
+    for path in paths:
+        assert list(reader.read_records(path)) == list(
+            pdf_table.Reader(table_bbox=layout.bbox).read_records(path)
+        )
+
+
+def test_repr() -> None:
+    assert repr(pdf_table.Reader(table_bbox=SIMPLE.bbox)) == repr(
+        pdf_table.Reader(table_bbox=SIMPLE.bbox, workers=2, learn_template=True)
+    )
@@ -0,0 +1,67 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from beancount_daoru.readers import xlsx
+
+NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+
+SHARED_STRINGS = (
+    f"<sst {NS}>"
+    "<si><t>微信支付账单明细</t></si>"
+    "<si><t>交易时间</t></si>"
+    "<si><t>金额(元)</t></si>"
+    "<si><r><t>备</t></r><r><t>注</t></r></si>"
+    "</sst>"
+)
+
+SHEET = (
+    f"<worksheet {NS}><sheetData>"
+    '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1"/></row>'
+    '<row r="2"/>'
+    '<row r="3"><c r="A3" t="s"><v>1</v></c><c r="B3" t="s"><v>2</v></c>'
+    '<c r="C3" t="s"><v>3</v></c></row>'
+    '<row r="4"><c r="A4" t="inlineStr"><is><t>2019-09-24 10:10:11</t></is></c>'
+    '<c r="C4" t="str"><v>/ </v></c></row>'
+    '<row r="5"><c r="A5" t="inlineStr"><is><t>2019-09-25 10:10:11</t></is></c>'
+    '<c r="B5"><v>1.5</v></c></row>'
+    '<row r="6"><c r="A6" s="1"><v>43732.5</v></c><c r="B6" s="3"><v>1E-2</v></c>'
+    '<c r="C6" s="2"><v>0.25</v></c></row>'
+    '<row r="7"><c r="A7" s="4"><v>43733</v></c><c r="B7" s="1"><v>x</v></c></row>'
+    "</sheetData></worksheet>"
+)
+
+STYLES = (
+    f"<styleSheet {NS}>"
+    '<numFmts count="1">'
+    '<numFmt numFmtId="176" formatCode="yyyy\\-mm\\-dd\\ hh:mm:ss"/>'
+    "</numFmts>"
+    '<cellXfs count="5">'
+    '<xf numFmtId="0"/><xf numFmtId="176"/><xf numFmtId="21"/>'
+    '<xf numFmtId="4"/><xf numFmtId="14"/>'
+    "</cellXfs>"
+    "</styleSheet>"
+)
+
+
+@pytest.fixture
+def file(tmp_path: Path) -> Path:
+    path = tmp_path / "bill.xlsx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("xl/sharedStrings.xml", SHARED_STRINGS)
+        archive.writestr("xl/styles.xml", STYLES)
+        archive.writestr("xl/worksheets/sheet1.xml", SHEET)
+    return path
+
+
+def test_read(file: Path) -> None:
+    reader = xlsx.Reader(header=2)
+    with reader.read(file) as document:
+        assert list(document.captions) == ["微信支付账单明细"]
+        assert list(document.records) == [
+            {"交易时间": "2019-09-24 10:10:11", "金额(元)": "", "备注": "/"},
+            {"交易时间": "2019-09-25 10:10:11", "金额(元)": "1.5", "备注": ""},
+            {"交易时间": "2019-09-24 12:00:00", "金额(元)": "0.01", "备注": "06:00:00"},
+            {"交易时间": "2019-09-25 00:00:00", "金额(元)": "x", "备注": ""},
+        ]
@@ -0,0 +1,50 @@
+import re
+
+from beancount_daoru.dispatch import Dispatcher
+from beancount_daoru.importer import Importer
+from beancount_daoru.importers import alipay, wechat
+from beancount_daoru.readers import csv_table
+
+FILENAMES = [
+    "/downloads/支付宝交易明细(20230210-20230213).csv",
+    "/downloads/微信支付账单流水文件(20190801-20190930)——【解压密码可在微信支付公众号查看】.xlsx",
+    "/downloads/statement-2020.csv",
+    "/downloads/statement-(2020).csv",
+    "/downloads/notes.txt",
+]
+
+
+def _importer(pattern: re.Pattern[str]) -> Importer:
+    return Importer(
+        pattern,
+        csv_table.Reader(header=0),
+        alipay.Parser(),
+        account_mapping={},
+        currency_mapping={},
+    )
+
+
+def test_candidates() -> None:
+    importers = [
+        alipay.Importer(account_mapping={}, currency_mapping={}),
+        alipay.Importer(account_mapping={}, currency_mapping={}),
+        wechat.Importer(account_mapping={}, currency_mapping={}),
+        _importer(re.compile(r"statement-.*\.csv")),
+        _importer(re.compile(r"statement-\((\d+)\)\.csv")),
+        _importer(re.compile(r"STATEMENT-\d+\.CSV", re.IGNORECASE)),
+    ]
+    expected = {
+        filename: [
+            importer
+            for importer in importers
+            if importer.filename_pattern.fullmatch(filename.rpartition("/")[2])
+        ]
+        for filename in FILENAMES
+    }
+    dispatcher = Dispatcher(importers)
+
+    for filename in FILENAMES:
+        assert set(dispatcher.candidates(filename)) == set(expected[filename])
+        for importer in importers:
+            assert importer.identify(filename) == (importer in expected[filename])
+    assert [len(expected[filename]) for filename in FILENAMES] == [2, 1, 2, 2, 0]
@@ -0,0 +1,329 @@
+import datetime
+import os
+import re
+from decimal import Decimal
+from pathlib import Path
+from typing import Literal
+
+import beancount
+import pytest
+from beancount.parser.parser import parse_string
+from beangulp.extract import DUPLICATE
+from typing_extensions import override
+
+from beancount_daoru.importer import (
+    Importer,
+    ImporterKwargs,
+    Posting,
+    SourceReference,
+    Transaction,
+)
+from beancount_daoru.importers.alipay import Parser, Record
+from tests.beancount_daoru.conftest import CountingReader
+
+CONTENT = (
+    "支付宝账户：{account}\n"
+    "终止时间：[2020-01-31 23:59:59]\n"
+    "交易时间,交易分类,交易对方,对方账号,商品说明,收/支,金额,收/付款方式,交易状态,备注\n"
+    "2020-01-01 10:00:00,餐饮美食,商家,/,午餐,支出,1.00,余额,交易成功,\n"
+)
+SourceMetadata = Literal["record", "reference"] | tuple[str, ...] | None
+ROW = "2020-01-{day:02} 10:00:00,餐饮美食,商家,/,午餐,支出,1.00,余额,交易成功,\n"
+ORDER_CONTENT = (
+    "支付宝账户：a@example.com\n"
+    "终止时间：[2020-01-31 23:59:59]\n"
+    "交易时间,交易分类,交易对方,对方账号,商品说明,收/支,金额,收/付款方式,"
+    "交易状态,交易订单号,商家订单号,备注\n"
+)
+
+
+class BalanceParser(Parser):
+    @override
+    def _parse_validated(self, validated: Record) -> Transaction:
+        transaction = super()._parse_validated(validated)
+        balance = Posting(Decimal(transaction.narration or 0), "余额")
+        return transaction._replace(balance=balance)
+
+
+def _importer(
+    reader: CountingReader,
+    journal_dir: Path | None = None,
+    source_metadata: SourceMetadata = "record",
+    parser: Parser | None = None,
+    balance_assertions: Literal["end_of_day", "all"] = "end_of_day",
+) -> Importer:
+    kwargs: ImporterKwargs = {
+        "account_mapping": {
+            "a@example.com": {None: "Assets:A", "余额": "Assets:A"},
+            "b@example.com": {None: "Assets:B", "余额": "Assets:B"},
+        },
+        "currency_mapping": {None: "CNY"},
+        "source_metadata": source_metadata,
+        "balance_assertions": balance_assertions,
+    }
+    if journal_dir is not None:
+        kwargs["journal_dir"] = journal_dir
+    return Importer(
+        re.compile(r".*\.csv"),
+        reader,
+        Parser() if parser is None else parser,
+        **kwargs,
+    )
+
+
+def test_cached_metadata(tmp_path: Path) -> None:
+    files = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    for file, account in zip(files, ["a@example.com", "b@example.com"], strict=True):
+        _ = file.write_text(CONTENT.format(account=account), encoding="utf-8")
+    reader = CountingReader(header=2)
+    importer = _importer(reader)
+
+    for _ in range(2):
+        for file, account in zip(files, ["Assets:A", "Assets:B"], strict=True):
+            assert importer.account(str(file)) == account
+            assert importer.date(str(file)) == datetime.date(2020, 1, 31)
+    assert reader.count == len(files)
+
+    _ = importer.extract(str(files[0]), [])
+    assert reader.count == len(files) + 1
+
+    _ = files[0].write_text(CONTENT.format(account="b@example.com"), encoding="utf-8")
+    stat = files[0].stat()
+    os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert importer.account(str(files[0])) == "Assets:B"
+    assert reader.count == len(files) + 2
+
+
+def test_journal(tmp_path: Path) -> None:
+    january, february = tmp_path / "january.csv", tmp_path / "february.csv"
+    header = CONTENT.format(account="a@example.com")
+    _ = january.write_text(header + ROW.format(day=2), encoding="utf-8")
+    _ = february.write_text(
+        header + ROW.format(day=2) * 2 + ROW.format(day=3), encoding="utf-8"
+    )
+    importer = _importer(CountingReader(header=2), journal_dir=tmp_path / "journal")
+
+    assert [e.date.day for e in importer.extract(str(january), [])] == [1, 2]
+    assert importer.extract(str(january), []) == []
+    assert [e.date.day for e in importer.extract(str(february), [])] == [2, 3]
+    assert importer.extract(str(february), []) == []
+
+
+def test_deduplicate(tmp_path: Path) -> None:
+    january, february = tmp_path / "january.csv", tmp_path / "february.csv"
+    header = CONTENT.format(account="a@example.com")
+    _ = january.write_text(header + ROW.format(day=2), encoding="utf-8")
+    _ = february.write_text(header + ROW.format(day=5), encoding="utf-8")
+    importer = _importer(CountingReader(header=2))
+    existing = importer.extract(str(january), [])
+
+    entries = importer.extract(str(february), [])
+    importer.deduplicate(entries, existing)
+    assert [e.meta.get(DUPLICATE) for e in entries] == [existing[0], None]
+
+    printed = [e._replace(meta=e.meta.copy()) for e in existing]
+    for e in printed:
+        del e.meta["__source__"]
+    entries = importer.extract(str(february), [])
+    importer.deduplicate(entries, printed)
+    assert [e.meta.get(DUPLICATE) for e in entries] == [printed[0], None]
+
+    entries = importer.extract(str(february), [])
+    printed = [printed[0], printed[1]._replace(date=datetime.date(2020, 1, 4))]
+    importer.deduplicate(entries, printed)
+    assert [e.meta.get(DUPLICATE) for e in entries] == [printed[0], printed[1]]
+
+
+def test_deduplicate_identical(tmp_path: Path) -> None:
+    header = CONTENT.format(account="a@example.com").removesuffix(ROW.format(day=1))
+    january, february = tmp_path / "january.csv", tmp_path / "february.csv"
+    _ = january.write_text(header + ROW.format(day=1), encoding="utf-8")
+    _ = february.write_text(header + ROW.format(day=1) * 2, encoding="utf-8")
+    importer = _importer(CountingReader(header=2))
+    existing = importer.extract(str(january), [])
+
+    # two purchases of the same amount on the same day, one imported before
+    entries = importer.extract(str(february), [])
+    importer.deduplicate(entries, existing)
+    assert [e.meta.get(DUPLICATE) for e in entries] == [existing[0], None]
+
+    existing.extend(entries)
+    entries = importer.extract(str(february), [])
+    importer.deduplicate(entries, existing)
+    assert [e.meta.get(DUPLICATE) for e in entries] == existing[:2]
+
+
+def test_deduplicate_printed(tmp_path: Path) -> None:
+    header = CONTENT.format(account="a@example.com").removesuffix(ROW.format(day=1))
+    file = tmp_path / "a.csv"
+    _ = file.write_text(header + ROW.format(day=1) * 2, encoding="utf-8")
+    importer = _importer(CountingReader(header=2))
+    text = "".join(beancount.format_entry(e) for e in importer.extract(str(file), []))
+    printed, errors, _ = parse_string(text)  # pyright: ignore[reportAny]
+    assert not errors
+    assert all("__source__" not in e.meta for e in printed)
+
+    entries = importer.extract(str(file), [])
+    importer.deduplicate(entries, printed[1:])
+    assert [e.meta.get(DUPLICATE) for e in entries] == [printed[1], None]
+
+    entries = importer.extract(str(file), [])
+    importer.deduplicate(entries, printed)
+    assert [e.meta.get(DUPLICATE) for e in entries] == printed
+
+
+def test_journal_transaction_id(tmp_path: Path) -> None:
+    row = "2020-01-01 10:00:00,餐饮美食,商家,/,午餐,支出,1.00,余额,{status},1001,M1,\n"
+    january, february = tmp_path / "january.csv", tmp_path / "february.csv"
+    _ = january.write_text(ORDER_CONTENT + row.format(status="交易成功"), "utf-8")
+    _ = february.write_text(ORDER_CONTENT + row.format(status="交易关闭"), "utf-8")
+    importer = _importer(CountingReader(header=2), journal_dir=tmp_path / "journal")
+
+    (entry,) = importer.extract(str(january), [])
+    assert isinstance(entry, beancount.Transaction)
+    assert entry.meta["transaction_id"] == "1001"
+    assert entry.meta["merchant_order_id"] == "M1"
+    assert entry.flag == beancount.FLAG_OKAY
+    assert importer.extract(str(january), []) == []
+
+    # the closed payment is imported again, flagged for review
+    (entry,) = importer.extract(str(february), [])
+    assert isinstance(entry, beancount.Transaction)
+    assert entry.meta["status"] == "交易关闭"
+    assert entry.flag == beancount.FLAG_WARNING
+    assert entry.meta["error"] == "transaction changed since it was imported"
+    assert importer.extract(str(february), []) == []
+
+
+def test_order_links(tmp_path: Path) -> None:
+    file = tmp_path / "a.csv"
+    rows = [
+        "2020-01-02 10:00:00,退款,商家,/,退款,不计收支,1.00,余额,退款成功,1002,M 1,",
+        "2020-01-01 10:00:00,餐饮美食,商家,/,午餐,支出,1.00,余额,交易成功,1001,M 1,",
+        "2020-01-01 11:00:00,餐饮美食,商家,/,晚餐,支出,1.00,余额,交易成功,1003,,",
+    ]
+    _ = file.write_text(ORDER_CONTENT + "\n".join(rows) + "\n", encoding="utf-8")
+    importer = _importer(CountingReader(header=2))
+
+    # the refund shares the link of its payment
+    assert [
+        entry.links
+        for entry in importer.extract(str(file), [])
+        if isinstance(entry, beancount.Transaction)
+    ] == [frozenset({"order-M-1"}), frozenset({"order-M-1"}), frozenset()]
+
+
+@pytest.mark.parametrize(
+    ("source_metadata", "source"),
+    [
+        (("金额", "备注", "unknown"), "{'金额': '1.00', '备注': ''}"),
+        (None, None),
+    ],
+)
+def test_source_metadata(
+    tmp_path: Path, source_metadata: SourceMetadata, source: str | None
+) -> None:
+    file = tmp_path / "a.csv"
+    _ = file.write_text(CONTENT.format(account="a@example.com"), encoding="utf-8")
+    importer = _importer(CountingReader(header=2), source_metadata=source_metadata)
+
+    (entry,) = importer.extract(str(file), [])
+    assert entry.meta.get("__source__") == source
+
+
+def test_source_reference(tmp_path: Path) -> None:
+    file = tmp_path / "a.csv"
+    content = CONTENT.format(account="a@example.com") + ROW.format(day=2)
+    _ = file.write_text(content, encoding="utf-8")
+    importer = _importer(CountingReader(header=2), source_metadata="reference")
+
+    reference = importer.extract(str(file), [])[1].meta["__source__"]  # pyright: ignore[reportAny]
+    assert isinstance(reference, SourceReference)
+    assert reference.position == 1
+    assert importer.source_record(str(file), reference)["交易时间"] == (
+        "2020-01-02 10:00:00"
+    )
+
+    _ = file.write_text(content + ROW.format(day=3), encoding="utf-8")
+    with pytest.raises(ValueError, match="file changed"):
+        _ = importer.source_record(str(file), reference)
+
+
+@pytest.mark.parametrize(
+    ("balance_assertions", "expected"),
+    [
+        ("end_of_day", [(3, 3, False), (2, 2, False)]),
+        ("all", [(3, 3, False), (2, 2, False), (2, 1, True)]),
+    ],
+)
+def test_balance_assertions(
+    tmp_path: Path,
+    balance_assertions: Literal["end_of_day", "all"],
+    expected: list[tuple[int, int, bool]],
+) -> None:
+    # records are in reverse chronological order, the balance of a date is the
+    # one of its first record
+    row = (
+        "2020-01-{day:02} 10:00:00,餐饮美食,商家,/,{balance},支出,1.00,余额,交易成功,\n"
+    )
+    file = tmp_path / "balances.csv"
+    _ = file.write_text(
+        CONTENT.format(account="a@example.com").removesuffix(ROW.format(day=1))
+        + row.format(day=2, balance=3)
+        + row.format(day=1, balance=2)
+        + row.format(day=1, balance=1),
+        encoding="utf-8",
+    )
+    importer = _importer(
+        CountingReader(header=2),
+        parser=BalanceParser(),
+        balance_assertions=balance_assertions,
+    )
+
+    entries = importer.extract(str(file), [])
+    importer.deduplicate(entries, [])
+    assert [
+        (e.date.day, int(e.amount.number or 0), DUPLICATE in e.meta)
+        for e in entries
+        if isinstance(e, beancount.Balance)
+    ] == expected
+    assert sorted(
+        e.amount.number or 0
+        for e in importer.stream(str(file), [])
+        if isinstance(e, beancount.Balance) and DUPLICATE not in e.meta
+    ) == [2, 3]
+
+
+@pytest.mark.parametrize("verify_balances", [True, False])
+def test_verify_balances(tmp_path: Path, *, verify_balances: bool) -> None:
+    row = (
+        "2020-01-{day:02} 10:00:00,餐饮美食,商家,/,{balance},支出,1.00,余额,交易成功,\n"
+    )
+    file = tmp_path / "balances.csv"
+    _ = file.write_text(
+        CONTENT.format(account="a@example.com").removesuffix(ROW.format(day=1))
+        + row.format(day=3, balance=8)
+        + row.format(day=2, balance=9)
+        + row.format(day=1, balance=11),
+        encoding="utf-8",
+    )
+    kwargs: ImporterKwargs = {
+        "account_mapping": {"a@example.com": {None: "Assets:A", "余额": "Assets:A"}},
+        "currency_mapping": {None: "CNY"},
+        "verify_balances": verify_balances,
+    }
+    importer = Importer(
+        re.compile(r".*\.csv"), CountingReader(header=2), BalanceParser(), **kwargs
+    )
+
+    errors = [
+        (e.date.day, e.meta.get("error"))
+        for e in importer.extract(str(file), [])
+        if isinstance(e, beancount.Transaction)
+    ]
+    expected = "balance 11 breaks the running balance, expected 10.00"
+    assert errors == [
+        (3, None),
+        (2, None),
+        (1, expected if verify_balances else None),
+    ]
@@ -0,0 +1,57 @@
+import io
+import runpy
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from beangulp import extract as beangulp_extract
+from beangulp import utils
+
+from beancount_daoru.ingest import extract, write
+
+if TYPE_CHECKING:
+    from beangulp import Importer
+
+    from beancount_daoru.hook import Hook
+
+EXAMPLE_DIR = Path(__file__).parent.parent.parent / "examples" / "import_only"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_extract(workers: int) -> None:
+    config = runpy.run_path(str(EXAMPLE_DIR / "import.py"))
+    filenames = sorted(utils.walk([str(EXAMPLE_DIR / "downloads")]))
+
+    importers = cast("list[Importer]", config["CONFIG"])
+    hooks = cast("list[Hook]", config["HOOKS"])
+
+    imported = extract(importers, filenames, hooks=hooks, workers=workers)
+
+    output = io.StringIO()
+    beangulp_extract.print_extracted_entries(imported, output)
+    expected = (EXAMPLE_DIR / "ledger" / "imported.beancount").read_text(
+        encoding="utf-8"
+    )
+    assert output.getvalue() == expected
+
+
+def test_write() -> None:
+    config = runpy.run_path(str(EXAMPLE_DIR / "import.py"))
+    expected = (EXAMPLE_DIR / "ledger" / "imported.beancount").read_text(
+        encoding="utf-8"
+    )
+    filenames = sorted(utils.walk([str(EXAMPLE_DIR / "downloads")]))
+
+    importers = cast("list[Importer]", config["CONFIG"])
+    hooks = cast("list[Hook]", config["HOOKS"])
+
+    output = io.StringIO()
+    write(importers, filenames, output, hooks=hooks)
+    # documents are written in the given order, and entries in the order of
+    # the records instead of sorted by line number
+    assert _blocks(output.getvalue()) == _blocks(expected)
+
+
+def _blocks(text: str) -> Counter[str]:
+    return Counter(block.strip() for block in text.split("\n\n"))
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+import beancount_daoru
+
+
+def test_lazy_import() -> None:
+    code = (
+        "import sys\n"
+        "from beancount_daoru import AlipayImporter\n"
+        "print(*sorted({'pdfplumber', 'pyexcel', 'openai'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_attributes() -> None:
+    assert "AlipayImporter" in dir(beancount_daoru)
+    assert beancount_daoru.Dispatcher.__module__ == "beancount_daoru.dispatch"
+    assert beancount_daoru.PathToName.__module__ == "beancount_daoru.hooks.path_to_name"
@@ -0,0 +1,90 @@
+import pytest
+
+from beancount_daoru.importer import ParserError
+from beancount_daoru.rules import ANY, Affix, RuleTable
+
+
+@pytest.fixture(scope="module")
+def table() -> RuleTable[str]:
+    return RuleTable(
+        ("dc", "type"),
+        [
+            (("out", Affix("refund-")), "refund {0}"),
+            (("out", {"pay", "transfer"}), "out"),
+            (("in", ANY), "in"),
+            ((None, Affix("fund-", "-income")), "income {0}"),
+            ((None, Affix("余额宝-", "-收益发放")), "余额宝 {0}"),
+            (
+                (None, "fund"),
+                RuleTable(
+                    ("desc",),
+                    [
+                        (("buy",), "fund buy"),
+                        ((None,), "fund"),
+                    ],
+                ),
+            ),
+            ((ANY, "pay"), "unreachable for out"),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ("record", "action", "captures"),
+    [
+        ({"dc": "out", "type": "pay"}, "out", ()),
+        ({"dc": "out", "type": "refund-pay"}, "refund {0}", ("pay",)),
+        ({"dc": "in", "type": "refund-pay"}, "in", ()),
+        ({"dc": None, "type": "fund-a-income"}, "income {0}", ("a",)),
+        ({"dc": None, "type": "fund-income"}, "income {0}", ("",)),
+        (
+            {"dc": None, "type": "余额宝-2020.01.01-收益发放"},
+            "余额宝 {0}",
+            ("2020.01.01",),
+        ),
+        ({"dc": None, "type": "余额宝-收益发放"}, "余额宝 {0}", ("",)),
+        ({"dc": None, "type": "fund", "desc": "buy"}, "fund buy", ()),
+        ({"dc": None, "type": "fund", "desc": None}, "fund", ()),
+        ({"dc": "other", "type": "pay"}, "unreachable for out", ()),
+    ],
+)
+def test_lookup(
+    table: RuleTable[str],
+    record: dict[str, str | None],
+    action: str,
+    captures: tuple[str, ...],
+) -> None:
+    assert table.lookup(record) == (action, captures)
+
+
+@pytest.mark.parametrize(
+    ("record", "message"),
+    [
+        (
+            {"dc": "out", "type": "other"},
+            "unsupported value combination of fields: ('dc', 'type')",
+        ),
+        (
+            {"dc": None, "type": "fund", "desc": "sell"},
+            "unsupported value combination of fields: ('dc', 'type', 'desc')",
+        ),
+    ],
+)
+def test_lookup_error(
+    table: RuleTable[str], record: dict[str, str | None], message: str
+) -> None:
+    with pytest.raises(ParserError) as excinfo:
+        _ = table.lookup(record)
+    assert str(excinfo.value) == message
+
+
+def test_extended(table: RuleTable[str]) -> None:
+    extended = table.extended([(("out", "pay"), "custom"), (("out", ANY), "other")])
+    assert extended.lookup({"dc": "out", "type": "pay"}) == ("custom", ())
+    assert extended.lookup({"dc": "out", "type": "x"}) == ("other", ())
+    assert table.lookup({"dc": "out", "type": "pay"}) == ("out", ())
+
+
+def test_invalid_rule() -> None:
+    with pytest.raises(ValueError, match="does not match fields"):
+        _ = RuleTable(("dc", "type"), [(("out",), "out")])